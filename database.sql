@@ -30,7 +30,8 @@ CREATE TABLE `notice` (
   `start_date` datetime DEFAULT NULL,
   `end_date` datetime DEFAULT NULL,
   `image_url` varchar(300) DEFAULT NULL,
-  PRIMARY KEY (`idnotice`)
+  PRIMARY KEY (`idnotice`),
+  KEY `idx_notice_end_date` (`end_date`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb3;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -43,6 +44,34 @@ LOCK TABLES `notice` WRITE;
 /*!40000 ALTER TABLE `notice` ENABLE KEYS */;
 UNLOCK TABLES;
 
+--
+-- Table structure for table `notice_archive`
+--
+
+DROP TABLE IF EXISTS `notice_archive`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!50503 SET character_set_client = utf8mb4 */;
+CREATE TABLE `notice_archive` (
+  `idnotice` int NOT NULL,
+  `name_notice` varchar(300) DEFAULT NULL,
+  `start_date` datetime DEFAULT NULL,
+  `end_date` datetime DEFAULT NULL,
+  `image_url` varchar(300) DEFAULT NULL,
+  `archived_at` datetime NOT NULL,
+  PRIMARY KEY (`idnotice`),
+  KEY `idx_notice_archive_end_date` (`end_date`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb3;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Dumping data for table `notice_archive`
+--
+
+LOCK TABLES `notice_archive` WRITE;
+/*!40000 ALTER TABLE `notice_archive` DISABLE KEYS */;
+/*!40000 ALTER TABLE `notice_archive` ENABLE KEYS */;
+UNLOCK TABLES;
+
 --
 -- Table structure for table `usuarios`
 --
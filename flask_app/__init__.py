@@ -4,17 +4,65 @@ Aplicación Flask modularizada
 from flask import Flask
 from flask import send_from_directory
 from flask_login import LoginManager
-from flask_app.controllers import register_routes, require_login_for_panel, handle_needs_login
+from flask_app.controllers import register_routes, require_login_for_panel, handle_needs_login, register_health_routes
 from flask_app.config.mysqlconnection import connectToMySQL
+from flask_app.json_provider import FastJSONProvider
+from flask_app.compression import init_compression
+from flask_app.profiling import init_profiling
+from flask_app.timing import init_timing
+from flask_app.single_flight import single_flight
+from flask_app.snapshot import last_known_good
+from flask_app.shared_cache import shared_cache, default_dir
+from flask_app.jobs import init_jobs
+from flask_app.static_export import init_static_export
+from flask_app.telemetry import init_telemetry
 import os
 
 def create_app():
     """Factory function para crear la aplicación Flask"""
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     
     # Configuración básica
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'popipopipopopopipo')
     app.config['UPLOAD_FOLDER'] = os.environ.get('UPLOAD_FOLDER', 'static/uploads')
+    app.config['COMPRESS_MIN_SIZE'] = int(os.environ.get('COMPRESS_MIN_SIZE', 500))
+    app.config['COMPRESS_LEVEL'] = int(os.environ.get('COMPRESS_LEVEL', 6))
+    app.config['COMPRESS_BR_LEVEL'] = int(os.environ.get('COMPRESS_BR_LEVEL', 5))
+    app.config['PROFILING_ENABLED'] = os.environ.get('PROFILING_ENABLED', '0') == '1'
+    app.config['PROFILING_SAMPLE_EVERY'] = int(os.environ.get('PROFILING_SAMPLE_EVERY', 0))
+    app.config['PROFILING_MIN_MS'] = float(os.environ.get('PROFILING_MIN_MS', 200))
+    app.config['PROFILING_MAX_FILES'] = int(os.environ.get('PROFILING_MAX_FILES', 200))
+    if os.environ.get('PROFILING_DIR'):
+        app.config['PROFILING_DIR'] = os.environ['PROFILING_DIR']
+    app.config['SERVER_TIMING_ENABLED'] = os.environ.get('SERVER_TIMING_ENABLED', '1') == '1'
+    app.config['ACCESS_LOG_ENABLED'] = os.environ.get('ACCESS_LOG_ENABLED', '1') == '1'
+    app.config['SNAPSHOT_PATH'] = os.environ.get(
+        'SNAPSHOT_PATH', os.path.join(app.instance_path, 'last_known_good.json')
+    )
+    app.config['SINGLE_FLIGHT_DIR'] = os.environ.get(
+        'SINGLE_FLIGHT_DIR', os.path.join(app.instance_path, 'single_flight')
+    )
+    app.config['SHARED_CACHE_DIR'] = os.environ.get('SHARED_CACHE_DIR', default_dir())
+    app.config['SHARED_CACHE_SIZE'] = int(os.environ.get('SHARED_CACHE_SIZE', 4 * 1024 * 1024))
+    app.config['JOBS_DB_PATH'] = os.environ.get('JOBS_DB_PATH', os.path.join(app.instance_path, 'jobs.sqlite3'))
+    app.config['JOBS_WORKERS'] = int(os.environ.get('JOBS_WORKERS', 2))
+    app.config['ARCHIVE_AFTER_DAYS'] = int(os.environ.get('ARCHIVE_AFTER_DAYS', 30))
+    app.config['ARCHIVE_INTERVAL_SECONDS'] = int(os.environ.get('ARCHIVE_INTERVAL_SECONDS', 3600))
+    app.config['EXPORT_DIR'] = os.environ.get('EXPORT_DIR', '')
+    app.config['EXPORT_INTERVAL_SECONDS'] = int(os.environ.get('EXPORT_INTERVAL_SECONDS', 600))
+    app.config['EXPORT_KEEP'] = int(os.environ.get('EXPORT_KEEP', 5))
+    app.config['EXPORT_TELEMETRY'] = os.environ.get('EXPORT_TELEMETRY', '0') == '1'
+    app.config['IMAGE_MAX_WIDTH'] = int(os.environ.get('IMAGE_MAX_WIDTH', 1920))
+    app.config['TELEMETRY_DB_PATH'] = os.environ.get(
+        'TELEMETRY_DB_PATH', os.path.join(app.instance_path, 'telemetry.sqlite3')
+    )
+    app.config['TELEMETRY_FLUSH_SECONDS'] = int(os.environ.get('TELEMETRY_FLUSH_SECONDS', 60))
+    app.config['TELEMETRY_RETENTION_DAYS'] = int(os.environ.get('TELEMETRY_RETENTION_DAYS', 7))
+    app.config['TELEMETRY_MAX_SCREENS'] = int(os.environ.get('TELEMETRY_MAX_SCREENS', 500))
+    app.config['TELEMETRY_MAX_KEYS'] = int(os.environ.get('TELEMETRY_MAX_KEYS', 5000))
+    app.config['TELEMETRY_MAX_ERRORS'] = int(os.environ.get('TELEMETRY_MAX_ERRORS', 1000))
+    app.config['TELEMETRY_BATCHES_PER_SCREEN'] = int(os.environ.get('TELEMETRY_BATCHES_PER_SCREEN', 10))
     
     # Configurar Flask-Login
     login_manager = LoginManager()
@@ -41,9 +89,38 @@ def create_app():
     
     # Registrar todas las rutas
     register_routes(app)
+    register_health_routes(app)
     
     # Registrar middleware después de que las rutas estén disponibles
     require_login_for_panel(app)
+
+    # Tiempos por fase (Server-Timing y log de acceso); antes que la
+    # compresión para que el total la incluya
+    init_timing(app)
+
+    # Compresión gzip/brotli de HTML y JSON
+    init_compression(app)
+
+    # Perfilado bajo demanda (solo si PROFILING_ENABLED=1)
+    init_profiling(app)
+    
+    # Cargar la última copia buena de avisos y clima antes de tocar la BD
+    last_known_good.configure(app.config['SNAPSHOT_PATH'])
+    
+    # Coalescencia de cargas entre workers del mismo host
+    single_flight.configure(app.config['SINGLE_FLIGHT_DIR'])
+    
+    # Avisos y clima compartidos entre workers (memoria mapeada)
+    shared_cache.configure(app.config['SHARED_CACHE_DIR'], app.config['SHARED_CACHE_SIZE'])
+    
+    # Cola de tareas posteriores a las escrituras (retoma las pendientes)
+    init_jobs(app)
+    
+    # Exportación estática de la pantalla (solo si EXPORT_DIR está configurado)
+    init_static_export(app)
+    
+    # Telemetría de las pantallas (lotes en memoria, volcado periódico)
+    init_telemetry(app)
     
     # Crear carpeta de uploads si no existe
     full_upload_path = os.path.join(app.root_path, app.config['UPLOAD_FOLDER'])
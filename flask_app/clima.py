@@ -7,65 +7,79 @@ def obtener_clima_nueva_imperial():
     Retorna un diccionario con la información del clima
     """
     try:
-        # Coordenadas de Nueva Imperial
-        latitude = -38.74451
-        longitude = -72.95025
-
-        # URL de la API
-        url = "https://api.open-meteo.com/v1/forecast"
-
-        # Parámetros de consulta
-        params = {
-            "latitude": latitude,
-            "longitude": longitude,
-            "daily": "temperature_2m_max,temperature_2m_min,precipitation_sum",
-            "current_weather": "true",
-            "timezone": "America/Santiago"
-        }
-
-        # Hacemos la petición
-        response = requests.get(url, params=params)
-        data = response.json()
-
-        # Fecha de hoy
-        hoy = str(date.today())
-
-        # Datos del clima actual
-        current_weather = data.get("current_weather", {})
-        temperatura_actual = current_weather.get("temperature", 0)
-        codigo_clima = current_weather.get("weathercode", 0)
-
-        # Buscamos la posición de la fecha de hoy en la respuesta
-        clima_info = {
-            "temperatura_actual": temperatura_actual,
-            "codigo_clima": codigo_clima,
-            "icono_bootstrap": obtener_icono_bootstrap(codigo_clima),
-            "descripcion": obtener_descripcion_clima(codigo_clima),
-            "fecha": hoy
-        }
-
-        if hoy in data["daily"]["time"]:
-            idx = data["daily"]["time"].index(hoy)
-            clima_info.update({
-                "temperatura_max": data["daily"]["temperature_2m_max"][idx],
-                "temperatura_min": data["daily"]["temperature_2m_min"][idx],
-                "precipitacion": data["daily"]["precipitation_sum"][idx]
-            })
-
-        return clima_info
-
-    except Exception as e:
+        return consultar_clima()
+    except Exception:
         # En caso de error, retornar valores por defecto
-        return {
-            "temperatura_actual": 15,
-            "codigo_clima": 0,
-            "icono_bootstrap": "bi-sun",
-            "descripcion": "Soleado",
-            "fecha": str(date.today()),
-            "temperatura_max": 20,
-            "temperatura_min": 10,
-            "precipitacion": 0
-        }
+        return clima_por_defecto()
+
+
+def consultar_clima():
+    """
+    Consulta Open-Meteo y retorna el clima actual para Nueva Imperial.
+    A diferencia de obtener_clima_nueva_imperial(), lanza la excepción si falla.
+    """
+    # Coordenadas de Nueva Imperial
+    latitude = -38.74451
+    longitude = -72.95025
+
+    # URL de la API
+    url = "https://api.open-meteo.com/v1/forecast"
+
+    # Parámetros de consulta
+    params = {
+        "latitude": latitude,
+        "longitude": longitude,
+        "daily": "temperature_2m_max,temperature_2m_min,precipitation_sum",
+        "current_weather": "true",
+        "timezone": "America/Santiago"
+    }
+
+    # Hacemos la petición
+    response = requests.get(url, params=params, timeout=10)
+    response.raise_for_status()
+    data = response.json()
+
+    # Fecha de hoy
+    hoy = str(date.today())
+
+    # Datos del clima actual
+    current_weather = data.get("current_weather", {})
+    temperatura_actual = current_weather.get("temperature", 0)
+    codigo_clima = current_weather.get("weathercode", 0)
+
+    # Buscamos la posición de la fecha de hoy en la respuesta
+    clima_info = {
+        "temperatura_actual": temperatura_actual,
+        "codigo_clima": codigo_clima,
+        "icono_bootstrap": obtener_icono_bootstrap(codigo_clima),
+        "descripcion": obtener_descripcion_clima(codigo_clima),
+        "fecha": hoy
+    }
+
+    if hoy in data["daily"]["time"]:
+        idx = data["daily"]["time"].index(hoy)
+        clima_info.update({
+            "temperatura_max": data["daily"]["temperature_2m_max"][idx],
+            "temperatura_min": data["daily"]["temperature_2m_min"][idx],
+            "precipitacion": data["daily"]["precipitation_sum"][idx]
+        })
+
+    return clima_info
+
+
+def clima_por_defecto():
+    """Valores de clima usados cuando no hay datos reales disponibles"""
+    return {
+        "temperatura_actual": 15,
+        "codigo_clima": 0,
+        "icono_bootstrap": "bi-sun",
+        "descripcion": "Soleado",
+        "fecha": str(date.today()),
+        "temperatura_max": 20,
+        "temperatura_min": 10,
+        "precipitacion": 0
+    }
+
 
 def obtener_icono_bootstrap(codigo_clima):
     """
@@ -0,0 +1,90 @@
+"""
+Compresión de respuestas HTML y JSON.
+
+Negocia brotli o gzip según Accept-Encoding (brotli solo si el paquete
+`brotli` está instalado). Solo se comprimen respuestas 200 de tipos de
+texto que superen COMPRESS_MIN_SIZE bytes.
+
+Si la respuesta viene de la caché de cuerpos serializados (tiene el
+atributo `cached_body`), la variante comprimida se guarda en esa misma
+entrada: la compresión se paga una vez por versión del contenido y no en
+cada petición.
+"""
+import gzip
+
+from flask import request
+
+from flask_app.timing import phase
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'text/html',
+    'text/css',
+    'text/plain',
+    'application/json',
+    'application/javascript',
+    'text/javascript',
+}
+
+
+def choose_encoding(accept_encodings):
+    """Elige 'br', 'gzip' o None a partir de request.accept_encodings."""
+    if brotli is not None and accept_encodings.quality('br') > 0:
+        return 'br'
+    if accept_encodings.quality('gzip') > 0:
+        return 'gzip'
+    return None
+
+
+def compress(body, encoding, config):
+    with phase('compress'):
+        if encoding == 'br':
+            return brotli.compress(body, quality=config['COMPRESS_BR_LEVEL'])
+        return gzip.compress(body, compresslevel=config['COMPRESS_LEVEL'], mtime=0)
+
+
+def init_compression(app):
+    """Registra el hook after_request que comprime las respuestas."""
+    app.config.setdefault('COMPRESS_ENABLED', True)
+    app.config.setdefault('COMPRESS_MIN_SIZE', 500)
+    app.config.setdefault('COMPRESS_LEVEL', 6)
+    app.config.setdefault('COMPRESS_BR_LEVEL', 5)
+
+    @app.after_request
+    def _compress_response(response):
+        if not app.config['COMPRESS_ENABLED']:
+            return response
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        if (response.status_code != 200
+                or response.direct_passthrough
+                or response.is_streamed
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        entry = getattr(response, 'cached_body', None)
+        if entry is not None:
+            body = entry.variants.get(encoding)
+            if body is None and len(entry.body) >= app.config['COMPRESS_MIN_SIZE']:
+                body = entry.variants[encoding] = compress(entry.body, encoding, app.config)
+        else:
+            data = response.get_data()
+            body = compress(data, encoding, app.config) if len(data) >= app.config['COMPRESS_MIN_SIZE'] else None
+
+        if body is None:
+            return response
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -1,30 +1,193 @@
+"""
+Conexión a MySQL con separación de lecturas y escrituras.
+
+El servidor primario se configura con DB_HOST (y opcionalmente DB_PORT).
+Las réplicas de lectura se configuran con DB_REPLICA_HOSTS como una lista
+separada por comas, por ejemplo: "10.0.0.2,10.0.0.3:3307".
+
+- connectToMySQL(db) abre siempre contra el primario (escrituras y flujos
+  de administración que deben leer sus propias escrituras).
+- connectToMySQL(db, read_only=True) abre contra una réplica sana en
+  round-robin; si una réplica falla se prueba la siguiente y, si ninguna
+  responde, se usa el primario.
+
+Cada servidor tiene un circuit breaker: tras DB_BREAKER_THRESHOLD fallos
+de conexión consecutivos el circuito se abre y los intentos fallan al
+instante con DatabaseUnavailable, sin esperar el timeout de conexión. Un
+hilo en segundo plano prueba el servidor cada DB_BREAKER_PROBE_SECONDS y
+cierra el circuito cuando vuelve a responder. db_status() devuelve el
+estado de los circuitos y conexiones sin tocar la base de datos.
+
+La conexión y cada consulta se miden como la fase `db` de la petición en
+curso (ver flask_app/timing.py).
+
+Para pruebas se puede reemplazar el atributo de módulo `connector` por una
+función compatible con pymysql.connect (p.ej. un fake en memoria).
+tools/comprobar_replicas.py lo usa para comprobar el round-robin, el salto
+de réplicas caídas y la vuelta al primario.
+"""
+from contextlib import contextmanager
+import itertools
+import threading
+import time
+
 import pymysql.cursors
 from dotenv import load_dotenv
 import os
 
+from flask_app.timing import phase
+
 load_dotenv()
 
+
+def _parse_host(value, default_port=3306):
+    """Convierte 'host' o 'host:puerto' en una tupla (host, puerto)."""
+    value = value.strip()
+    if ':' in value:
+        host, port = value.rsplit(':', 1)
+        return host, int(port)
+    return value, default_port
+
+
+PRIMARY = _parse_host(os.getenv('DB_HOST') or 'localhost', int(os.getenv('DB_PORT', 3306)))
+REPLICAS = [_parse_host(h) for h in os.getenv('DB_REPLICA_HOSTS', '').split(',') if h.strip()]
+CONNECT_TIMEOUT = int(os.getenv('DB_CONNECT_TIMEOUT', 5))
+BREAKER_THRESHOLD = int(os.getenv('DB_BREAKER_THRESHOLD', 3))
+BREAKER_PROBE_SECONDS = float(os.getenv('DB_BREAKER_PROBE_SECONDS', 5))
+
+# Función usada para abrir conexiones; reemplazable en pruebas
+connector = pymysql.connect
+
+_round_robin = itertools.count()
+
+
+class DatabaseUnavailable(pymysql.err.OperationalError):
+    """El circuito del servidor está abierto: no se intenta conectar."""
+
+
+class CircuitBreaker:
+    """Circuit breaker de conexiones a un servidor MySQL."""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+
+    def __init__(self, server, threshold=BREAKER_THRESHOLD, probe_seconds=BREAKER_PROBE_SECONDS):
+        self.server = server
+        self.threshold = threshold
+        self.probe_seconds = probe_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self.connections_opened = 0
+        self.connections_failed = 0
+        self.connections_active = 0
+        self._lock = threading.Lock()
+
+    def before_connect(self):
+        if self.state == self.OPEN:
+            raise DatabaseUnavailable(2003, f"Circuito abierto para {self.server[0]}:{self.server[1]}: {self.last_error}")
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.connections_opened += 1
+            self.connections_active += 1
+
+    def record_close(self):
+        with self._lock:
+            self.connections_active -= 1
+
+    def record_failure(self, error):
+        with self._lock:
+            self.failures += 1
+            self.connections_failed += 1
+            self.last_error = str(error)
+            if self.state == self.OPEN or self.failures < self.threshold:
+                return
+            self.state = self.OPEN
+            self.opened_at = time.time()
+        print("Circuito abierto para", self.server, error)
+        threading.Thread(target=self._probe_loop, daemon=True).start()
+
+    def _probe_loop(self):
+        while self.state == self.OPEN:
+            time.sleep(self.probe_seconds)
+            try:
+                connector(
+                    host=self.server[0],
+                    port=self.server[1],
+                    user=os.getenv('DB_USER'),
+                    password=os.getenv('DB_PASSWORD'),
+                    connect_timeout=CONNECT_TIMEOUT,
+                ).close()
+            except Exception as e:
+                self.last_error = str(e)
+                continue
+            with self._lock:
+                self.state = self.CLOSED
+                self.failures = 0
+                self.opened_at = None
+            print("Circuito cerrado para", self.server)
+
+    def status(self):
+        return {
+            'server': f'{self.server[0]}:{self.server[1]}',
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'opened_at': self.opened_at,
+            'last_error': self.last_error,
+            'connections_opened': self.connections_opened,
+            'connections_failed': self.connections_failed,
+            'connections_active': self.connections_active,
+        }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(server):
+    breaker = _breakers.get(server)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(server, CircuitBreaker(server))
+    return breaker
+
+
 class MySQLConnection:
-    def __init__(self, db):
-        connection = pymysql.connect(
-            host=os.getenv('DB_HOST'),
-            user=os.getenv('DB_USER'),
-            password=os.getenv('DB_PASSWORD'),
-            db=db,
-            charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor,
-            autocommit=False  # Cambiado a False para control manual
-        )
+    def __init__(self, db, host=None):
+        self.connection = None
+        self.host = host or PRIMARY
+        self.breaker = breaker_for(self.host)
+        self.breaker.before_connect()
+        try:
+            with phase('db'):
+                connection = connector(
+                    host=self.host[0],
+                    port=self.host[1],
+                    user=os.getenv('DB_USER'),
+                    password=os.getenv('DB_PASSWORD'),
+                    db=db,
+                    charset='utf8mb4',
+                    cursorclass=pymysql.cursors.DictCursor,
+                    connect_timeout=CONNECT_TIMEOUT,
+                    autocommit=False  # Cambiado a False para control manual
+                )
+        except (pymysql.err.MySQLError, OSError) as e:
+            self.breaker.record_failure(e)
+            raise
+        self.breaker.record_success()
         self.connection = connection
-    
+
     def query_db(self, query, data=None):
-        with self.connection.cursor() as cursor:
+        with phase('db'), self.connection.cursor() as cursor:
             try:
                 query_str = cursor.mogrify(query, data)
                 print("Running Query:", query_str)
-                
+
                 cursor.execute(query, data)
-                
+
                 if query.lower().find("insert") >= 0:
                     self.connection.commit()
                     return cursor.lastrowid
@@ -35,20 +198,75 @@ class MySQLConnection:
                     # UPDATE, DELETE, etc.
                     self.connection.commit()
                     return True
-                    
+
             except Exception as e:
                 print("Something went wrong", e)
                 self.connection.rollback()
                 return False
-    
+
+    def fetch_rows(self, query, data=None):
+        """Ejecuta un SELECT y devuelve tuplas, sin construir diccionarios por fila."""
+        with phase('db'), self.connection.cursor(pymysql.cursors.Cursor) as cursor:
+            cursor.execute(query, data)
+            return cursor.fetchall()
+
+    @contextmanager
+    def transaction(self):
+        """Cursor de tuplas dentro de una transacción.
+
+        Hace commit al salir del bloque y rollback si se lanza una excepción.
+        """
+        with phase('db'):
+            cursor = self.connection.cursor(pymysql.cursors.Cursor)
+            try:
+                yield cursor
+                self.connection.commit()
+            except Exception:
+                self.connection.rollback()
+                raise
+            finally:
+                cursor.close()
+
     def close(self):
         """Método para cerrar la conexión manualmente"""
         if self.connection:
             self.connection.close()
-    
+            self.connection = None
+            self.breaker.record_close()
+
     def __del__(self):
         """Cerrar la conexión cuando el objeto se destruye"""
-        self.close()
+        try:
+            self.close()
+        except Exception:
+            pass
 
-def connectToMySQL(db):
-    return MySQLConnection(db)
\ No newline at end of file
+
+def _replicas_disponibles():
+    """Réplicas con el circuito cerrado, en round-robin a partir de la siguiente."""
+    if not REPLICAS:
+        return []
+    sanas = [r for r in REPLICAS if breaker_for(r).state == CircuitBreaker.CLOSED]
+    if not sanas:
+        return []
+    inicio = next(_round_robin) % len(sanas)
+    return sanas[inicio:] + sanas[:inicio]
+
+
+def db_status():
+    """Estado en memoria de los circuitos del primario y las réplicas."""
+    return {
+        'primary': breaker_for(PRIMARY).status(),
+        'replicas': [breaker_for(r).status() for r in REPLICAS],
+    }
+
+
+def connectToMySQL(db, read_only=False):
+    """Abre una conexión al primario, o a una réplica si read_only=True."""
+    if read_only:
+        for replica in _replicas_disponibles():
+            try:
+                return MySQLConnection(db, host=replica)
+            except (pymysql.err.MySQLError, OSError) as e:
+                print("Réplica no disponible", replica, e)
+    return MySQLConnection(db)
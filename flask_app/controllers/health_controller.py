@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""
+Endpoints de salud para balanceadores y pantallas.
+
+Ambos responden a partir del estado en memoria de los circuit breakers de
+la base de datos, nunca abren una conexión, así que no se bloquean aunque
+MySQL esté caído:
+- /healthz: el proceso está vivo (siempre 200) e informa del estado.
+- /readyz: 200 si el circuito del primario está cerrado, 503 si está abierto.
+
+/healthz incluye además el estado de la cola de tareas en segundo plano y
+la versión y antigüedad de los datos de la caché compartida.
+"""
+from flask import jsonify
+
+from flask_app.config.mysqlconnection import CircuitBreaker, db_status
+from flask_app.jobs import job_queue
+from flask_app.shared_cache import shared_cache
+
+
+def register_health_routes(app):
+    @app.route('/healthz', methods=['GET'])
+    def healthz():
+        """Liveness: el proceso responde"""
+        return jsonify({'status': 'ok', 'db': db_status(), 'jobs': job_queue.stats(), 'cache': shared_cache.status()})
+
+
+    @app.route('/readyz', methods=['GET'])
+    def readyz():
+        """Readiness: la base de datos primaria está disponible"""
+        status = db_status()
+        ready = status['primary']['state'] == CircuitBreaker.CLOSED
+        return jsonify({'status': 'ready' if ready else 'unavailable', 'db': status}), 200 if ready else 503
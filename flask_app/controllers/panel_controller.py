@@ -11,9 +11,10 @@ También centraliza la construcción de URLs públicas para imágenes mediante
 la función build_image_url() para evitar prefijos duplicados como
 "/static/static/uploads/...".
 """
-from datetime import datetime
+from datetime import datetime, timedelta
 import hashlib
 import os
+import time
 
 from flask import (
     render_template,
@@ -30,16 +31,41 @@ from flask_login import UserMixin, login_user, login_required, logout_user, curr
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
 
-from flask_app.config.mysqlconnection import connectToMySQL
-from flask_app.clima import obtener_clima_nueva_imperial
+from flask_app.config.mysqlconnection import connectToMySQL, DatabaseUnavailable
+from flask_app.clima import consultar_clima, clima_por_defecto
+from flask_app.json_provider import body_cache, cached_json_response
+from flask_app.single_flight import single_flight
+from flask_app.jobs import job_queue
+from flask_app.snapshot import last_known_good, by_start_date, notices_from_rows, notices_to_rows
+from flask_app.shared_cache import shared_cache
+from flask_app.static_export import STATIC_EXPORT_ENVIRON
+from flask_app.repositories import notice_repository
+from flask_app.timing import phase
 
 # Config
 UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', 'static/uploads')
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 MASTER_KEY = os.environ.get('MASTER_KEY', 'complejoprincipedegalescuenta25')
-
-# Memoria local simple (no persistente) usada por algunas vistas
-avisos = []
+# Segundos durante los que otros workers reutilizan una carga recién hecha
+SHARE_SECONDS = float(os.environ.get('SINGLE_FLIGHT_SHARE_SECONDS', 2))
+CLIMA_SHARE_SECONDS = float(os.environ.get('CLIMA_SHARE_SECONDS', 60))
+# Segundos durante los que se sirven los datos de la caché compartida sin
+# volver a consultar MySQL / Open-Meteo. Las ediciones del panel publican
+# la lista nueva en el momento, así que no esperan a que caduque.
+NOTICES_CACHE_SECONDS = float(os.environ.get('NOTICES_CACHE_SECONDS', 10))
+CLIMA_CACHE_SECONDS = float(os.environ.get('CLIMA_CACHE_SECONDS', 300))
+# Tras un fallo de Open-Meteo, segundos durante los que se sirve el último
+# clima guardado sin volver a consultar (evita esperar el timeout en cada
+# petición mientras dure la caída)
+CLIMA_RETRY_SECONDS = float(os.environ.get('CLIMA_RETRY_SECONDS', CLIMA_CACHE_SECONDS))
+# Segundos por adelantado con los que se anuncian a las pantallas los avisos
+# programados (los que aún no llegaron a su fecha de inicio)
+PUBLISH_HORIZON_SECONDS = float(os.environ.get('PUBLISH_HORIZON_SECONDS', 86400))
+# Segundos que un aviso sigue en /panel/avisos_programados después de
+# publicarse, para que una pantalla que consulta justo después de la hora (o
+# con el reloj atrasado) no pierda la publicación. Debe cubrir al menos el
+# intervalo de consulta de script.js (5 min).
+PUBLISH_GRACE_SECONDS = float(os.environ.get('PUBLISH_GRACE_SECONDS', 600))
 
 
 class User(UserMixin):
@@ -55,17 +81,6 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
-def fmt_mysql(dt_str):
-    """Normaliza una fecha ISO para MySQL (añade segundos si faltan)."""
-    if not dt_str:
-        return None
-    s = dt_str.replace('T', ' ')
-    parts = s.split(' ')
-    if len(parts) > 1 and len(parts[1]) == 5:
-        s = s + ':00'
-    return s
-
-
 def fmt_field(dt):
     if not dt:
         return None
@@ -123,6 +138,197 @@ def build_image_url(image_field):
     return '/' + os.path.join('static', image_field).replace('\\', '/')
 
 
+def notice_to_api(notice):
+    """Representación JSON de un aviso, común a la API pública y al panel.
+
+    Las fechas se dejan como datetime: el proveedor JSON las serializa en ISO.
+    """
+    return {
+        'id': str(notice.id),
+        'title': notice.title,
+        'description': '',
+        'image_url': build_image_url(notice.image_url) if notice.image_url else '',
+        'fecha_inicio': notice.start_date,
+        'fecha_fin': notice.end_date,
+    }
+
+
+def ordenar_por_proximidad(notices, now):
+    """Mapea los avisos y los ordena por cercanía de su fecha de inicio a `now`.
+
+    Primero los próximos, luego los ya iniciados y al final los que no tienen fecha.
+    """
+    avisos_con_fecha = []
+    avisos_sin_fecha = []
+
+    for notice in notices:
+        aviso_data = notice_to_api(notice)
+        if notice.start_date:
+            avisos_con_fecha.append((aviso_data, notice.start_date))
+        else:
+            avisos_sin_fecha.append(aviso_data)
+
+    def calcular_proximidad_api(item):
+        aviso_data, fecha_inicio = item
+        try:
+            if isinstance(fecha_inicio, str):
+                fecha_inicio = datetime.fromisoformat(fecha_inicio.replace('T', ' '))
+            diff = abs((fecha_inicio - now).days)
+            return diff if fecha_inicio >= now else diff + 1000
+        except Exception:
+            return 9999
+
+    avisos_con_fecha.sort(key=calcular_proximidad_api)
+    return [item[0] for item in avisos_con_fecha] + avisos_sin_fecha
+
+
+def is_live(notice, now):
+    """Un aviso se publica en su fecha de inicio; sin fecha se muestra siempre."""
+    return notice.start_date is None or notice.start_date <= now
+
+
+def live_notices(notices, now):
+    """Los avisos ya publicados en `now`, en el mismo orden."""
+    return [n for n in notices if is_live(n, now)]
+
+
+def upcoming_notices(notices, now, horizon, grace=0):
+    """Los avisos que se publican en los próximos `horizon` segundos, por fecha de publicación.
+
+    Con `grace` se incluyen también los publicados en los últimos `grace` segundos.
+    """
+    since = now - timedelta(seconds=grace)
+    limit = now + timedelta(seconds=horizon)
+    upcoming = [n for n in notices if n.start_date is not None and since < n.start_date <= limit]
+    upcoming.sort(key=lambda n: n.start_date)
+    return upcoming
+
+
+def publish_notices(notices):
+    """Comparte una lista recién leída de la BD con los demás workers y la guarda en disco."""
+    last_known_good.update_notices(notices)
+    try:
+        shared_cache.notices.publish(notices)
+    except (OSError, ValueError):
+        current_app.logger.exception('No se pudo publicar los avisos en la caché compartida')
+
+
+def cached_notices():
+    """Última lista de avisos conocida (caché compartida o copia en disco), sin ir a la BD."""
+    entry = shared_cache.notices.read()
+    if entry is not None:
+        return entry.value
+    return last_known_good.notices or []
+
+
+def load_public_notices():
+    """Todos los avisos para las pantallas públicas, coalesciendo cargas concurrentes.
+
+    Devuelve (avisos, stale). Mientras la caché compartida sea reciente se
+    sirve de ahí; si no, un solo hilo por host consulta la base de datos y
+    publica el resultado. Si la base de datos no responde se usa la última
+    copia buena guardada en disco y stale es True.
+    """
+    notices = shared_cache.notices.fresh(NOTICES_CACHE_SECONDS)
+    if notices is not None:
+        return notices, False
+    try:
+        notices = single_flight.do(
+            'avisos', lambda: notice_repository.list_notices(read_only=True), share_for=SHARE_SECONDS,
+            encode=notices_to_rows, decode=notices_from_rows
+        )
+    except Exception as e:
+        if last_known_good.notices is None:
+            raise
+        current_app.logger.warning('Base de datos no disponible, sirviendo avisos guardados: %s', e)
+        return last_known_good.notices, True
+    publish_notices(notices)
+    return notices, False
+
+
+def load_home_notices():
+    """Los 4 avisos publicados de la portada, como (avisos, stale); ver load_public_notices()."""
+    now = datetime.now()
+    notices = shared_cache.notices.fresh(NOTICES_CACHE_SECONDS)
+    if notices is not None:
+        return by_start_date(live_notices(notices, now), 4), False
+    try:
+        notices = single_flight.do(
+            'home', lambda: notice_repository.list_by_start_date(4, read_only=True, live_at=now),
+            share_for=SHARE_SECONDS, encode=notices_to_rows, decode=notices_from_rows
+        )
+    except Exception as e:
+        if last_known_good.notices is None:
+            raise
+        current_app.logger.warning('Base de datos no disponible, sirviendo avisos guardados: %s', e)
+        return by_start_date(live_notices(last_known_good.notices, now), 4), True
+    return notices, False
+
+
+# Momento (time.time()) del último fallo de Open-Meteo en este worker
+_clima_failed_at = 0.0
+
+
+def _clima_guardado():
+    """Último clima guardado, marcado con 'stale', o los valores por defecto."""
+    if last_known_good.clima is None:
+        return clima_por_defecto()
+    return dict(last_known_good.clima, stale=True)
+
+
+def load_clima():
+    """Clima actual, con una sola consulta a Open-Meteo por ráfaga de peticiones.
+
+    El resultado se comparte entre workers durante CLIMA_CACHE_SECONDS. Si
+    Open-Meteo falla se usa el último clima guardado, marcado con 'stale',
+    o los valores por defecto si nunca se obtuvo uno, y no se vuelve a
+    consultar hasta pasados CLIMA_RETRY_SECONDS.
+    """
+    global _clima_failed_at
+    clima = shared_cache.clima.fresh(CLIMA_CACHE_SECONDS)
+    if clima is not None:
+        return clima
+    if time.time() - _clima_failed_at < CLIMA_RETRY_SECONDS:
+        return _clima_guardado()
+    try:
+        with phase('weather'):
+            clima = single_flight.do('clima', consultar_clima, share_for=CLIMA_SHARE_SECONDS)
+    except Exception as e:
+        _clima_failed_at = time.time()
+        current_app.logger.warning('Error obteniendo clima (reintento en %ss): %s', int(CLIMA_RETRY_SECONDS), e)
+        return _clima_guardado()
+    _clima_failed_at = 0.0
+    last_known_good.update_clima(clima)
+    try:
+        shared_cache.clima.publish(clima)
+    except (OSError, ValueError):
+        current_app.logger.exception('No se pudo publicar el clima en la caché compartida')
+    return clima
+
+
+def stale_headers(response, stale):
+    """Marca una respuesta servida desde la copia en disco."""
+    if stale:
+        response.headers['X-Data-Stale'] = str(last_known_good.notices_age() or 0)
+    return response
+
+
+def enqueue_after_write(action, notice_id, render=None, delete=None):
+    """Encola el trabajo posterior a una escritura ya confirmada en la BD.
+
+    `render` y `delete` son nombres de fichero de la carpeta de uploads.
+    """
+    try:
+        if delete:
+            job_queue.enqueue('delete_file', filename=delete)
+        if render:
+            job_queue.enqueue('render_image', filename=render)
+        job_queue.enqueue('rebuild_cache')
+        job_queue.enqueue('notify_change', action=action, notice_id=notice_id)
+    except Exception:
+        current_app.logger.exception('No se pudo encolar el trabajo posterior a %s', action)
+
+
 def require_login_for_panel(app):
     @app.before_request
     def _before_request():
@@ -131,7 +337,9 @@ def require_login_for_panel(app):
         except Exception:
             return None
         # Rutas públicas del panel
-        public_panel_paths = ['/panel/avisos', '/api/clima', '/panel/avisos_hash']
+        public_panel_paths = [
+            '/panel/avisos', '/api/clima', '/panel/avisos_hash', '/panel/avisos_programados', '/panel/telemetry'
+        ]
         if path.startswith('/panel') and path not in public_panel_paths:
             if not current_user.is_authenticated:
                 return redirect(url_for('login', next=request.url))
@@ -173,31 +381,32 @@ def register_routes(app):
         error_type = None
         main_card = None
         eventos = []
+        stale = False
 
         try:
-            db = connectToMySQL(os.environ.get('DB_NAME', 'panel_informativo'))
             # Obtener las últimas 4 noticias ordenadas por fecha de inicio
-            noticias = db.query_db('SELECT * FROM notice ORDER BY start_date ASC LIMIT 4')
+            noticias, stale = load_home_notices()
             
             if noticias:
-                # Procesar la noticia principal (primera)
-                noticia_principal = noticias[0]
-                main_card = {
-                    'titulo': noticia_principal.get('name_notice', 'Se acerca el 18, con ello<br>actividades recreativas<br>¡Pasalo chancho!'),
-                    'imagen_url': build_image_url(noticia_principal.get('image_url')) or '/static/main_panel/img/logo.png',
-                    'id': str(noticia_principal.get('idnotice')),
-                    'etiqueta_fecha': humanize_main_date(noticia_principal.get('start_date'))
-                }
-
-                # Procesar las noticias secundarias (hasta 3)
-                for noticia in noticias[1:]:
-                    eventos.append({
-                        'titulo': noticia.get('name_notice', ''),
-                        'fecha_inicio': fmt_field_display(noticia.get('start_date')),
-                        'fecha_fin': fmt_field_display(noticia.get('end_date')),
-                        'imagen_url': build_image_url(noticia.get('image_url')) or '/static/main_panel/img/logo.png',
-                        'id': str(noticia.get('idnotice'))
-                    })
+                with phase('map'):
+                    # Procesar la noticia principal (primera)
+                    noticia_principal = noticias[0]
+                    main_card = {
+                        'titulo': noticia_principal.title,
+                        'imagen_url': build_image_url(noticia_principal.image_url) or '/static/main_panel/img/logo.png',
+                        'id': str(noticia_principal.id),
+                        'etiqueta_fecha': humanize_main_date(noticia_principal.start_date)
+                    }
+
+                    # Procesar las noticias secundarias (hasta 3)
+                    for noticia in noticias[1:]:
+                        eventos.append({
+                            'titulo': noticia.title or '',
+                            'fecha_inicio': fmt_field_display(noticia.start_date),
+                            'fecha_fin': fmt_field_display(noticia.end_date),
+                            'imagen_url': build_image_url(noticia.image_url) or '/static/main_panel/img/logo.png',
+                            'id': str(noticia.id)
+                        })
             else:
                 # Si no hay noticias, mostrar contenido por defecto
                 main_card = {
@@ -210,10 +419,16 @@ def register_routes(app):
         except Exception as e:
             error_message = str(e)
             error_type = 'database_connection'
-            current_app.logger.exception('Error en home')
+            if isinstance(e, DatabaseUnavailable):
+                current_app.logger.warning('Error en home: %s', e)
+            else:
+                current_app.logger.exception('Error en home')
             
             # Determinar el tipo de error específico
-            if 'Access denied' in str(e) or 'authentication' in str(e).lower():
+            if isinstance(e, DatabaseUnavailable):
+                error_type = 'connection_refused'
+                error_title = 'Servidor de base de datos<br>no disponible'
+            elif 'Access denied' in str(e) or 'authentication' in str(e).lower():
                 error_type = 'database_auth'
                 error_title = 'Error de autenticación<br>en la base de datos'
             elif 'Unknown database' in str(e) or 'database' in str(e).lower() and 'not found' in str(e).lower():
@@ -236,20 +451,26 @@ def register_routes(app):
             }
 
         try:
-            clima = obtener_clima_nueva_imperial()
+            clima = load_clima()
         except Exception as e:
             current_app.logger.exception('Error obteniendo clima')
             clima = {'temperatura_actual': 15, 'icono_bootstrap': 'bi-sun', 'descripcion': 'Soleado'}
 
-        return render_template('main_panel/home.html', eventos=eventos, main_card=main_card, clima=clima, error_message=error_message, error_type=error_type)
+        # La página exportada solo envía telemetría si /panel/telemetry llega al backend
+        telemetria = not request.environ.get(STATIC_EXPORT_ENVIRON) or current_app.config.get('EXPORT_TELEMETRY', False)
+        return render_template('main_panel/home.html', eventos=eventos, main_card=main_card, clima=clima, error_message=error_message, error_type=error_type, stale=stale, telemetria=telemetria)
 
 
     @app.route('/api/clima', methods=['GET'])
     def get_clima():
         """API pública para obtener datos del clima"""
         try:
-            clima = obtener_clima_nueva_imperial()
-            return jsonify(clima)
+            clima = load_clima()
+            entry = body_cache.get_or_build(
+                'clima', tuple(sorted(clima.items())),
+                lambda: current_app.json.dump_bytes(clima)
+            )
+            return cached_json_response(entry)
         except Exception as e:
             current_app.logger.exception('Error en get_clima')
             return jsonify({'error': str(e), 'temperatura_actual': 15, 'icono_bootstrap': 'bi-sun', 'descripcion': 'Soleado'}), 500
@@ -257,50 +478,61 @@ def register_routes(app):
 
     @app.route('/panel/avisos', methods=['GET'])
     def get_avisos():
-        """API pública para obtener todos los avisos ordenados por proximidad de fecha"""
-        try:
-            db = connectToMySQL(os.environ.get('DB_NAME', 'panel_informativo'))
-            rows = db.query_db('SELECT * FROM notice ORDER BY idnotice DESC')
-            
-            mapped_all = []
-            avisos_con_fecha = []
-            avisos_sin_fecha = []
-
-            for r in rows:
-                image_field = r.get('image_url')
-                aviso_data = {
-                    'id': str(r.get('idnotice')),
-                    'title': r.get('name_notice'),
-                    'description': r.get('description') if 'description' in r else '',
-                    'image_url': build_image_url(image_field) if image_field else '',
-                    'fecha_inicio': fmt_field(r.get('start_date')),
-                    'fecha_fin': fmt_field(r.get('end_date')),
-                }
-                mapped_all.append(aviso_data)
+        """API pública para obtener los avisos publicados ordenados por proximidad de fecha
 
-                if r.get('start_date'):
-                    avisos_con_fecha.append((aviso_data, r.get('start_date')))
-                else:
-                    avisos_sin_fecha.append(aviso_data)
-
-            now = datetime.now()
+        Con ?all=1 (panel de administración) incluye también los programados.
+        """
+        try:
+            # El panel de administración (?all=1) lee del primario para ver
+            # sus propias escrituras; las pantallas públicas usan réplicas.
+            if request.args.get('all') == '1':
+                notices, stale = notice_repository.list_notices(), False
+                publish_notices(notices)
+                cache_name = 'avisos_todos'
+            else:
+                notices, stale = load_public_notices()
+                notices = live_notices(notices, datetime.now())
+                cache_name = 'avisos'
+
+            # El orden depende de la hora actual; se redondea al minuto para
+            # que las lecturas repetidas reutilicen el cuerpo ya serializado.
+            now = datetime.now().replace(second=0, microsecond=0)
+            key = (now, tuple(n.astuple() for n in notices))
+            with phase('map'):
+                entry = body_cache.get_or_build(
+                    cache_name, key,
+                    lambda: current_app.json.dump_bytes(ordenar_por_proximidad(notices, now))
+                )
+            return stale_headers(cached_json_response(entry), stale)
+        except Exception as e:
+            current_app.logger.exception('Error en get_avisos')
+            return jsonify({'error': str(e)}), 500
 
-            def calcular_proximidad_api(item):
-                aviso_data, fecha_inicio = item
-                try:
-                    if isinstance(fecha_inicio, str):
-                        fecha_inicio = datetime.fromisoformat(fecha_inicio.replace('T', ' '))
-                    diff = abs((fecha_inicio - now).days)
-                    return diff if fecha_inicio >= now else diff + 1000
-                except Exception:
-                    return 9999
 
-            avisos_con_fecha.sort(key=calcular_proximidad_api)
-            mapped = [item[0] for item in avisos_con_fecha] + avisos_sin_fecha
+    @app.route('/panel/avisos_programados', methods=['GET'])
+    def get_avisos_programados():
+        """API pública con los avisos que se publicarán en las próximas horas.
 
-            return jsonify(mapped)
+        Las pantallas descargan sus imágenes con antelación y los incorporan a
+        la rotación a su hora, sin volver a pedir /panel/avisos. Los avisos
+        publicados hace menos de PUBLISH_GRACE_SECONDS siguen en la lista.
+        """
+        try:
+            notices, stale = load_public_notices()
+            with phase('map'):
+                upcoming = upcoming_notices(
+                    notices, datetime.now(), PUBLISH_HORIZON_SECONDS, PUBLISH_GRACE_SECONDS
+                )
+                entry = body_cache.get_or_build(
+                    'avisos_programados', tuple(n.astuple() for n in upcoming),
+                    lambda: current_app.json.dump_bytes({
+                        'horizonte': int(PUBLISH_HORIZON_SECONDS),
+                        'avisos': [notice_to_api(n) for n in upcoming],
+                    })
+                )
+            return stale_headers(cached_json_response(entry), stale)
         except Exception as e:
-            current_app.logger.exception('Error en get_avisos')
+            current_app.logger.exception('Error en get_avisos_programados')
             return jsonify({'error': str(e)}), 500
 
 
@@ -308,18 +540,22 @@ def register_routes(app):
     def get_avisos_hash():
         """Devuelve un hash representando el estado actual de los avisos.
         El frontend puede usarlo para detectar cambios y recargar.
+
+        Incluye los avisos programados: que uno llegue a su hora de
+        publicación no cambia el hash (las pantallas ya lo tienen por
+        /panel/avisos_programados), solo lo cambian las ediciones.
         """
         try:
-            db = connectToMySQL(os.environ.get('DB_NAME', 'panel_informativo'))
-            rows = db.query_db('SELECT idnotice, name_notice, start_date, end_date, image_url FROM notice ORDER BY idnotice')
+            notices, stale = load_public_notices()
             parts = []
-            for r in rows:
+            for n in reversed(notices):
                 parts.append(
-                    f"{r.get('idnotice')}|{r.get('name_notice') or ''}|{fmt_field(r.get('start_date')) or ''}|{fmt_field(r.get('end_date')) or ''}|{r.get('image_url') or ''}"
+                    f"{n.id}|{n.title or ''}|{fmt_field(n.start_date) or ''}|{fmt_field(n.end_date) or ''}|{n.image_url or ''}"
                 )
             payload = '\n'.join(parts)
             digest = hashlib.md5(payload.encode('utf-8')).hexdigest()
-            return jsonify({'hash': digest})
+            data = {'hash': digest, 'stale': True} if stale else {'hash': digest}
+            return stale_headers(jsonify(data), stale)
         except Exception as e:
             current_app.logger.exception('Error en get_avisos_hash')
             return jsonify({'error': str(e)}), 500
@@ -382,23 +618,12 @@ def register_routes(app):
             return redirect(url_for('login', next=request.path))
         
         try:
-            db = connectToMySQL(os.environ.get('DB_NAME', 'panel_informativo'))
-            rows = db.query_db('SELECT * FROM notice ORDER BY idnotice DESC')
-            mapped = []
-            for r in rows:
-                mapped.append({
-                    'id': str(r.get('idnotice')),
-                    'title': r.get('name_notice'),
-                    'description': r.get('description') if 'description' in r else '',
-                    'image_url': build_image_url(r.get('image_url')) if r.get('image_url') else '',
-                    'fecha_inicio': fmt_field(r.get('start_date')),
-                    'fecha_fin': fmt_field(r.get('end_date')),
-                })
+            mapped = [notice_to_api(n) for n in notice_repository.list_notices()]
             return render_template('admin_panel/panel.html', avisos=mapped)
         except Exception as e:
             current_app.logger.exception('Error cargando panel')
             flash(f'Error cargando avisos desde la base de datos: {e}')
-            return render_template('admin_panel/panel.html', avisos=avisos)
+            return render_template('admin_panel/panel.html', avisos=[notice_to_api(n) for n in cached_notices()])
 
 
     @app.route('/edit_panel')
@@ -407,7 +632,30 @@ def register_routes(app):
         """Panel de edición (redirige al panel principal)"""
         if not current_user.is_authenticated:
             return redirect(url_for('login', next=request.path))
-        return render_template('admin_panel/panel.html', avisos=avisos)
+        return render_template('admin_panel/panel.html', avisos=[notice_to_api(n) for n in cached_notices()])
+
+
+    @app.route('/panel/archive', methods=['GET'])
+    @login_required
+    def get_archive():
+        """Avisos archivados (JSON), paginados con ?limit= y ?offset="""
+        try:
+            limit = min(max(int(request.args.get('limit', 50)), 1), 500)
+            offset = max(int(request.args.get('offset', 0)), 0)
+        except ValueError:
+            return jsonify({'error': 'limit y offset deben ser números enteros'}), 400
+
+        try:
+            notices = notice_repository.list_archived(limit, offset)
+            return jsonify({
+                'total': notice_repository.count_archived(),
+                'limit': limit,
+                'offset': offset,
+                'avisos': [notice_to_api(n) for n in notices],
+            })
+        except Exception as e:
+            current_app.logger.exception('Error en get_archive')
+            return jsonify({'error': str(e)}), 500
 
 
     @app.route('/panel/add', methods=['POST'])
@@ -430,17 +678,14 @@ def register_routes(app):
         except ValueError:
             return jsonify({"error": "Formato de fecha inválido. Use formato ISO (YYYY-MM-DDTHH:MM:SS)"}), 400
         
-        nuevo_aviso = {
-            'id': len(avisos) + 1,
-            'title': data['title'],
-            'image_url': data['image_url'],
-            'fecha_inicio': data['fecha_inicio'],
-            'fecha_fin': data['fecha_fin'],
-            'created_at': datetime.now().isoformat(),
-        }
-        
-        avisos.append(nuevo_aviso)
-        return jsonify(nuevo_aviso), 201
+        try:
+            notice = notice_repository.create_notice(data['title'], fecha_inicio, fecha_fin, data['image_url'])
+        except Exception as e:
+            current_app.logger.exception('Error en add_aviso')
+            return jsonify({'error': str(e)}), 500
+
+        enqueue_after_write('created', notice.id)
+        return jsonify(notice_to_api(notice)), 201
 
 
     @app.route('/panel/edit/<int:aviso_id>', methods=['PUT'])
@@ -451,7 +696,8 @@ def register_routes(app):
             return jsonify({"error": "El contenido debe ser JSON"}), 400
 
         data = request.get_json()
-        
+        fields = {}
+
         if 'fecha_inicio' in data or 'fecha_fin' in data:
             try:
                 nueva_inicio = datetime.fromisoformat(data.get('fecha_inicio')) if data.get('fecha_inicio') else None
@@ -460,60 +706,23 @@ def register_routes(app):
                     return jsonify({"error": "La fecha de fin debe ser posterior a la fecha de inicio"}), 400
             except ValueError:
                 return jsonify({"error": "Formato de fecha inválido. Use formato ISO (YYYY-MM-DDTHH:MM:SS)"}), 400
-
-        try:
-            db = connectToMySQL(os.environ.get('DB_NAME', 'panel_informativo'))
-            rows = db.query_db('SELECT * FROM notice WHERE idnotice = %(id)s', {'id': aviso_id})
-            if not rows:
-                return jsonify({"error": "Aviso no encontrado"}), 404
-            
-            set_clauses = []
-            params = {'id': aviso_id}
-
-            if 'title' in data:
-                set_clauses.append('name_notice = %(name)s')
-                params['name'] = data.get('title')
-            
             if 'fecha_inicio' in data:
-                set_clauses.append('start_date = %(start)s')
-                params['start'] = fmt_mysql(data.get('fecha_inicio'))
-            
+                fields['start_date'] = nueva_inicio
             if 'fecha_fin' in data:
-                set_clauses.append('end_date = %(end)s')
-                params['end'] = fmt_mysql(data.get('fecha_fin'))
-            
-            if 'image_url' in data:
-                set_clauses.append('image_url = %(img)s')
-                params['img'] = data.get('image_url')
-
-            if set_clauses:
-                sql = 'UPDATE notice SET ' + ', '.join(set_clauses) + ' WHERE idnotice = %(id)s'
-                try:
-                    db.query_db(sql, params)
-                except Exception:
-                    fallback_clauses = [c for c in set_clauses if not c.startswith('description') and not c.startswith('image_url')]
-                    if fallback_clauses:
-                        sql2 = 'UPDATE notice SET ' + ', '.join(fallback_clauses) + ' WHERE idnotice = %(id)s'
-                        db.query_db(sql2, params)
-
-            row = db.query_db('SELECT * FROM notice WHERE idnotice = %(id)s', {'id': aviso_id})
-            r = row[0] if row else rows[0]
-
-            mapped = {
-                'id': str(r.get('idnotice')),
-                'title': r.get('name_notice'),
-                'description': r.get('description') if 'description' in r else '',
-                'image_url': r.get('image_url') if 'image_url' in r else '',
-                'fecha_inicio': fmt_field(r.get('start_date')),
-                'fecha_fin': fmt_field(r.get('end_date')),
-            }
+                fields['end_date'] = nueva_fin
 
-            for aviso in avisos:
-                if aviso.get('id') == mapped['id']:
-                    aviso.update(mapped)
-                    break
+        if 'title' in data:
+            fields['title'] = data.get('title')
+        if 'image_url' in data:
+            fields['image_url'] = data.get('image_url')
 
-            return jsonify(mapped)
+        try:
+            notice = notice_repository.update_notice(aviso_id, **fields)
+            if notice is None:
+                return jsonify({"error": "Aviso no encontrado"}), 404
+
+            enqueue_after_write('updated', notice.id)
+            return jsonify(notice_to_api(notice))
         except Exception as e:
             current_app.logger.exception('Error en edit_aviso')
             return jsonify({'error': str(e)}), 500
@@ -524,35 +733,17 @@ def register_routes(app):
     def delete_aviso(aviso_id):
         """API para eliminar un aviso"""
         try:
-            db = connectToMySQL(os.environ.get('DB_NAME', 'panel_informativo'))
-            rows = db.query_db('SELECT * FROM notice WHERE idnotice = %(id)s', {'id': aviso_id})
-            if not rows:
+            notice = notice_repository.delete_notice(aviso_id)
+            if notice is None:
                 return jsonify({"error": "Aviso no encontrado"}), 404
-            
-            row = rows[0]
-            img_field = row.get('image_url') if 'image_url' in row else None
-            
-            if img_field:
-                filename = os.path.basename(img_field)
-                upload_folder = os.path.join(current_app.static_folder, 'uploads')
-                file_path = os.path.join(upload_folder, filename)
-                try:
-                    if os.path.exists(file_path):
-                        os.remove(file_path)
-                except Exception:
-                    pass
-            
-            db.query_db('DELETE FROM notice WHERE idnotice = %(id)s', {'id': aviso_id})
         except Exception as e:
             current_app.logger.exception('Error en delete_aviso')
             return jsonify({'error': f'Error al eliminar en la base de datos: {e}'}), 500
 
-        aviso_index = next((index for (index, aviso) in enumerate(avisos) if aviso['id'] == aviso_id), None)
-        aviso_eliminado = None
-        if aviso_index is not None:
-            aviso_eliminado = avisos.pop(aviso_index)
+        # La imagen se borra en segundo plano, después del commit
+        enqueue_after_write('deleted', aviso_id, delete=notice.image_url)
 
-        return jsonify({'deleted': aviso_id, 'removed_from_memory': aviso_eliminado is not None})
+        return jsonify({'deleted': aviso_id})
 
 
     @app.route('/panel/upload', methods=['POST'])
@@ -610,41 +801,8 @@ def register_routes(app):
             image_url_db = os.path.join('static', 'uploads', filename).replace('\\', '/')
 
         try:
-            db = connectToMySQL(os.environ.get('DB_NAME', 'panel_informativo'))
-            
-            start_sql = fmt_mysql(fecha_inicio)
-            end_sql = fmt_mysql(fecha_fin)
-            
-            try:
-                if filename:
-                    insert_result = db.query_db(
-                        'INSERT INTO notice (name_notice, start_date, end_date, image_url) VALUES (%(name)s, %(start)s, %(end)s, %(img)s)',
-                        {'name': title, 'start': start_sql, 'end': end_sql, 'img': image_url_db}
-                    )
-                else:
-                    insert_result = db.query_db(
-                        'INSERT INTO notice (name_notice, start_date, end_date) VALUES (%(name)s, %(start)s, %(end)s)',
-                        {'name': title, 'start': start_sql, 'end': end_sql}
-                    )
-            except Exception:
-                insert_result = db.query_db(
-                    'INSERT INTO notice (name_notice, start_date, end_date) VALUES (%(name)s, %(start)s, %(end)s)',
-                    {'name': title, 'start': start_sql, 'end': end_sql}
-                )
-
-            row = db.query_db('SELECT * FROM notice ORDER BY idnotice DESC LIMIT 1')
-            inserted = row[0] if row else None
-
-            nuevo_aviso = {
-                'id': str(inserted['idnotice']) if inserted else str(len(avisos) + 1),
-                'title': title,
-                'description': request.form.get('description', ''),
-                'image_url': image_url_db if image_url_db else '',
-                'fecha_inicio': fecha_inicio,
-                'fecha_fin': fecha_fin,
-                'created_at': datetime.now().isoformat(),
-            }
-            avisos.append(nuevo_aviso)
+            notice = notice_repository.create_notice(title, inicio, fin, image_url_db or None)
+            enqueue_after_write('created', notice.id, render=filename)
             flash('Noticia añadida correctamente')
             return redirect(url_for('panel'))
             
@@ -685,37 +843,24 @@ def register_routes(app):
         fecha_inicio = request.form.get('fecha_inicio')
         fecha_fin = request.form.get('fecha_fin')
 
+        fields = {'image_url': image_url_db}
         try:
-            db = connectToMySQL(os.environ.get('DB_NAME', 'panel_informativo'))
-            
-            set_clauses = ['image_url = %(img)s']
-            params = {'img': image_url_db, 'id': aviso_id}
-
             if title:
-                set_clauses.append('name_notice = %(name)s')
-                params['name'] = title
+                fields['title'] = title
             if fecha_inicio:
-                set_clauses.append('start_date = %(start)s')
-                params['start'] = fmt_mysql(fecha_inicio)
+                fields['start_date'] = datetime.fromisoformat(fecha_inicio)
             if fecha_fin:
-                set_clauses.append('end_date = %(end)s')
-                params['end'] = fmt_mysql(fecha_fin)
-
-            sql = 'UPDATE notice SET ' + ', '.join(set_clauses) + ' WHERE idnotice = %(id)s'
-            db.query_db(sql, params)
-
-            for aviso in avisos:
-                if aviso.get('id') == aviso_id:
-                    aviso['image_url'] = image_url_db
-                    if title:
-                        aviso['title'] = title
-                    if fecha_inicio:
-                        aviso['fecha_inicio'] = fecha_inicio
-                    if fecha_fin:
-                        aviso['fecha_fin'] = fecha_fin
-                    break
+                fields['end_date'] = datetime.fromisoformat(fecha_fin)
+        except ValueError:
+            return jsonify({'error': 'Formato de fecha inválido'}), 400
 
+        try:
+            notice = notice_repository.update_notice(aviso_id, **fields)
+            if notice is None:
+                return jsonify({"error": "Aviso no encontrado"}), 404
+
+            enqueue_after_write('updated', notice.id, render=filename)
             return jsonify({'ok': True, 'image_url': image_url_db})
         except Exception as e:
             current_app.logger.exception('Error actualizando imagen en BD')
-            return jsonify({'error': str(e)}), 500
\ No newline at end of file
+            return jsonify({'error': str(e)}), 500
@@ -0,0 +1,239 @@
+"""
+Cola de tareas en segundo plano para el trabajo posterior a un commit.
+
+Las rutas de escritura del panel encolan aquí lo que no hace falta hacer
+antes de responder (borrar ficheros, generar versiones de imágenes,
+reconstruir cachés, notificar cambios) y responden en cuanto la base de
+datos confirmó el cambio.
+
+Cada tarea es el nombre de un handler registrado con @job_queue.handler y
+un payload JSON. Antes de ejecutarse se anota en un diario SQLite
+(JOBS_DB_PATH) con el pid del proceso que la encoló, y se borra al
+terminar. Al arrancar, un proceso adopta las tareas de procesos que ya no
+existen, así que lo pendiente tras un reinicio se retoma; los workers vivos
+de gunicorn no se roban tareas entre sí.
+
+Las tareas que fallan se reintentan hasta MAX_ATTEMPTS veces con espera
+creciente. job_queue.stats() expone profundidad, tareas procesadas y
+fallidas, y latencias (espera en cola y ejecución) en milisegundos.
+
+job_queue.schedule() encola una tarea periódicamente (p.ej. el archivado de
+avisos antiguos) y job_queue.enqueue_in() una sola vez tras una espera. Cada
+worker programa las suyas; las tareas que no deben ejecutarse dos veces a la
+vez se coordinan por su cuenta.
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from flask import jsonify
+from flask_login import login_required
+
+MAX_ATTEMPTS = 3
+RETRY_SECONDS = 2
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobQueue:
+    def __init__(self):
+        self.handlers = {}
+        self.path = None
+        self._queue = queue.Queue()
+        self._db_lock = threading.Lock()
+        self._conn = None
+        self._app = None
+        self._started = False
+        self._stats_lock = threading.Lock()
+        self.processed = 0
+        self.failed = 0
+        self._wait_ms = deque(maxlen=500)
+        self._run_ms = deque(maxlen=500)
+
+    def handler(self, name):
+        """Decorador que registra una función como handler de las tareas `name`."""
+        def decorator(fn):
+            self.handlers[name] = fn
+            return fn
+        return decorator
+
+    def start(self, app, path, workers=2):
+        """Abre el diario, adopta tareas huérfanas y arranca los hilos."""
+        if self._started:
+            return
+        self._app = app
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS jobs ('
+            ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+            ' name TEXT NOT NULL,'
+            ' payload TEXT NOT NULL,'
+            ' owner INTEGER NOT NULL,'
+            ' attempts INTEGER NOT NULL DEFAULT 0,'
+            ' enqueued_at REAL NOT NULL)'
+        )
+        for job in self._adopt_orphans():
+            self._queue.put(job)
+        self._started = True
+        for i in range(workers):
+            threading.Thread(target=self._worker, name=f'job-worker-{i}', daemon=True).start()
+
+    def _adopt_orphans(self):
+        pid = os.getpid()
+        with self._db_lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                owners = [row[0] for row in self._conn.execute('SELECT DISTINCT owner FROM jobs')]
+                for owner in owners:
+                    if owner != pid and not _pid_alive(owner):
+                        self._conn.execute('UPDATE jobs SET owner = ? WHERE owner = ?', (pid, owner))
+                rows = self._conn.execute(
+                    'SELECT id, name, payload, attempts, enqueued_at FROM jobs WHERE owner = ? ORDER BY id', (pid,)
+                ).fetchall()
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return [(job_id, name, json.loads(payload), attempts, enqueued_at)
+                for job_id, name, payload, attempts, enqueued_at in rows]
+
+    def enqueue(self, name, **payload):
+        """Encola una tarea; sin start() (p.ej. en scripts) se ejecuta en el momento."""
+        if name not in self.handlers:
+            raise KeyError(f'Tarea desconocida: {name}')
+        if not self._started:
+            self.handlers[name](**payload)
+            return None
+        enqueued_at = time.time()
+        with self._db_lock:
+            cursor = self._conn.execute(
+                'INSERT INTO jobs (name, payload, owner, enqueued_at) VALUES (?, ?, ?, ?)',
+                (name, json.dumps(payload), os.getpid(), enqueued_at)
+            )
+        self._queue.put((cursor.lastrowid, name, payload, 0, enqueued_at))
+        return cursor.lastrowid
+
+    def _finish(self, job_id):
+        with self._db_lock:
+            self._conn.execute('DELETE FROM jobs WHERE id = ?', (job_id,))
+
+    def _retry(self, job_id, name, payload, attempts, enqueued_at):
+        with self._db_lock:
+            self._conn.execute('UPDATE jobs SET attempts = ? WHERE id = ?', (attempts, job_id))
+        timer = threading.Timer(
+            RETRY_SECONDS * attempts, self._queue.put, args=((job_id, name, payload, attempts, enqueued_at),)
+        )
+        timer.daemon = True
+        timer.start()
+
+    def _worker(self):
+        while True:
+            job_id, name, payload, attempts, enqueued_at = self._queue.get()
+            started = time.time()
+            try:
+                with self._app.app_context():
+                    self.handlers[name](**payload)
+            except Exception:
+                attempts += 1
+                self._app.logger.exception('Error en la tarea %s #%s (intento %s)', name, job_id, attempts)
+                with self._stats_lock:
+                    self.failed += 1
+                if attempts < MAX_ATTEMPTS:
+                    self._retry(job_id, name, payload, attempts, enqueued_at)
+                else:
+                    self._finish(job_id)
+            else:
+                self._finish(job_id)
+                with self._stats_lock:
+                    self.processed += 1
+                    self._wait_ms.append((started - enqueued_at) * 1000)
+                    self._run_ms.append((time.time() - started) * 1000)
+            finally:
+                self._queue.task_done()
+
+    def schedule(self, name, interval, delay=None, **payload):
+        """Encola la tarea `name` cada `interval` segundos (la primera vez tras `delay`)."""
+        if not self._started:
+            return
+
+        def loop():
+            time.sleep(interval if delay is None else delay)
+            while True:
+                try:
+                    self.enqueue(name, **payload)
+                except Exception:
+                    self._app.logger.exception('No se pudo programar la tarea %s', name)
+                time.sleep(interval)
+
+        threading.Thread(target=loop, name=f'job-schedule-{name}', daemon=True).start()
+
+    def enqueue_in(self, delay, name, **payload):
+        """Encola la tarea `name` una sola vez dentro de `delay` segundos; devuelve el Timer."""
+        if not self._started:
+            return None
+        timer = threading.Timer(delay, self.enqueue, args=(name,), kwargs=payload)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    def join(self):
+        """Espera a que se vacíe la cola (útil en scripts y pruebas)."""
+        self._queue.join()
+
+    def stats(self):
+        def resumen(valores):
+            if not valores:
+                return {'avg': None, 'max': None}
+            return {'avg': round(sum(valores) / len(valores), 1), 'max': round(max(valores), 1)}
+
+        with self._stats_lock:
+            wait_ms, run_ms = list(self._wait_ms), list(self._run_ms)
+            processed, failed = self.processed, self.failed
+        return {
+            'running': self._started,
+            'depth': self._queue.qsize(),
+            'processed': processed,
+            'failed': failed,
+            'wait_ms': resumen(wait_ms),
+            'run_ms': resumen(run_ms),
+        }
+
+
+job_queue = JobQueue()
+
+
+def init_jobs(app):
+    """Registra los handlers, arranca la cola y expone /panel/jobs."""
+    app.config.setdefault('JOBS_DB_PATH', os.path.join(app.instance_path, 'jobs.sqlite3'))
+    app.config.setdefault('JOBS_WORKERS', 2)
+    app.config.setdefault('ARCHIVE_AFTER_DAYS', 30)
+    app.config.setdefault('ARCHIVE_INTERVAL_SECONDS', 3600)
+
+    from flask_app import tasks  # noqa: F401  (registra los handlers)
+
+    job_queue.start(app, app.config['JOBS_DB_PATH'], app.config['JOBS_WORKERS'])
+
+    # Archivado periódico de avisos terminados (ARCHIVE_AFTER_DAYS=0 lo desactiva)
+    if app.config['ARCHIVE_AFTER_DAYS'] > 0:
+        job_queue.schedule('archive_notices', app.config['ARCHIVE_INTERVAL_SECONDS'], delay=60)
+
+    @app.route('/panel/jobs')
+    @login_required
+    def jobs_stats():
+        """Estado de la cola de tareas en segundo plano"""
+        return jsonify(job_queue.stats())
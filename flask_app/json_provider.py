@@ -0,0 +1,107 @@
+"""
+Proveedor JSON de la aplicación y caché de cuerpos serializados.
+
+FastJSONProvider usa orjson cuando está instalado (serializa datetime de
+forma nativa, en ISO 8601) y el encoder estándar en caso contrario,
+manteniendo el mismo formato de fechas que fmt_field().
+
+BodyCache guarda los bytes ya serializados de un payload junto a la clave
+que los generó; mientras la clave no cambie, las lecturas repetidas envían
+esos bytes sin volver a mapear ni codificar.
+"""
+from datetime import date
+import hashlib
+import json
+import threading
+
+from flask import current_app, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+
+def _default(o):
+    if isinstance(o, date):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Proveedor JSON rápido con soporte nativo de datetime."""
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        kwargs.setdefault('default', _default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def dump_bytes(self, obj):
+        """Serializa directamente a bytes, listos para el cuerpo de la respuesta."""
+        if orjson is not None:
+            return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(obj, default=_default, ensure_ascii=self.ensure_ascii, separators=(',', ':')).encode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dump_bytes(obj), mimetype=self.mimetype)
+
+
+class CachedBody:
+    """Cuerpo serializado de un payload para una clave concreta."""
+
+    __slots__ = ('key', 'body', 'etag', 'variants')
+
+    def __init__(self, key, body):
+        self.key = key
+        self.body = body
+        self.etag = hashlib.md5(body).hexdigest()
+        # Variantes derivadas del mismo cuerpo (p.ej. comprimidas), por nombre
+        self.variants = {}
+
+
+class BodyCache:
+    """Guarda la última versión serializada de cada payload con nombre."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get_or_build(self, name, key, build):
+        """Devuelve el CachedBody de `name` para `key`, construyéndolo con build() si cambió."""
+        entry = self._entries.get(name)
+        if entry is not None and entry.key == key:
+            return entry
+        entry = CachedBody(key, build())
+        with self._lock:
+            self._entries[name] = entry
+        return entry
+
+    def invalidate(self, name=None):
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+
+body_cache = BodyCache()
+
+
+def cached_json_response(entry):
+    """Respuesta JSON a partir de un CachedBody, con ETag y soporte de 304.
+
+    El ETag es débil porque el mismo contenido puede enviarse comprimido.
+    """
+    response = current_app.response_class(entry.body, mimetype=current_app.json.mimetype)
+    response.set_etag(entry.etag, weak=True)
+    response.cached_body = entry
+    return response.make_conditional(request)
@@ -0,0 +1,33 @@
+"""
+Directorios privados del proceso para ficheros compartidos entre workers.
+
+Los locks y resultados que comparten los workers (single flight, caché
+compartida) viven en directorios que pueden estar en rutas previsibles. Un
+directorio creado antes por otro usuario local le permitiría dejar ahí
+ficheros que la aplicación leería como propios, así que solo se aceptan
+directorios que pertenecen al usuario del proceso y que nadie más puede
+leer ni escribir.
+"""
+import os
+import stat
+
+
+class InsecureDirectory(OSError):
+    """El directorio existe pero no es privado del usuario del proceso."""
+
+
+def ensure_private_dir(path):
+    """Crea `path` con permisos 0o700 o comprueba que el existente es privado.
+
+    Lanza InsecureDirectory si es un enlace simbólico, no es un directorio,
+    pertenece a otro usuario o tiene permisos para el grupo u otros.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        raise InsecureDirectory(f'{path} no es un directorio')
+    if hasattr(os, 'getuid') and info.st_uid != os.getuid():
+        raise InsecureDirectory(f'{path} pertenece a otro usuario (uid {info.st_uid})')
+    if stat.S_IMODE(info.st_mode) & 0o077:
+        raise InsecureDirectory(f'{path} tiene permisos {oct(stat.S_IMODE(info.st_mode))}; se requiere 0o700')
+    return path
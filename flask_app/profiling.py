@@ -0,0 +1,166 @@
+"""
+Perfilado bajo demanda de peticiones individuales.
+
+Se activa con PROFILING_ENABLED. Con el perfilado activado, una petición se
+perfila cuando:
+- un usuario autenticado la marca con la cabecera `X-Profile: 1` o con el
+  parámetro `?_profile=1`, o
+- PROFILING_SAMPLE_EVERY = N > 0 y es una de cada N peticiones; en ese caso
+  el perfil solo se guarda si la petición tardó más de PROFILING_MIN_MS.
+
+El perfilador es de muestreo: un hilo lee la pila del hilo que atiende la
+petición cada PROFILING_INTERVAL_MS y acumula las pilas en formato
+"collapsed" (una línea `marco;marco;marco N` por pila), que aceptan
+flamegraph.pl, speedscope o inferno. Los ficheros se guardan en
+PROFILING_DIR, que se recorta a los PROFILING_MAX_FILES más recientes tras
+cada escritura, y se listan en el panel de administración (botón
+"Perfiles", que consulta /panel/profiles). La cabecera X-Profile-File con
+el nombre del perfil solo se envía a usuarios autenticados.
+
+Si PROFILING_ENABLED es falso no se registra ningún hook: coste cero.
+"""
+from collections import Counter
+from datetime import datetime
+import itertools
+import os
+import re
+import sys
+import threading
+import time
+
+from flask import current_app, g, jsonify, request, send_from_directory
+from flask_login import current_user, login_required
+
+
+class StackSampler(threading.Thread):
+    """Muestrea periódicamente la pila de un hilo concreto."""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._detener = threading.Event()
+
+    def run(self):
+        while not self._detener.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._detener.set()
+        self.join()
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+def _should_profile(app, counter):
+    flag = request.headers.get('X-Profile') == '1' or request.args.get('_profile') == '1'
+    if flag and current_user.is_authenticated:
+        return True, True
+    every = app.config['PROFILING_SAMPLE_EVERY']
+    if every and next(counter) % every == 0:
+        return True, False
+    return False, False
+
+
+def _write_profile(app, sampler, elapsed_ms):
+    endpoint = re.sub(r'[^A-Za-z0-9_.-]', '_', request.endpoint or 'unknown')
+    name = f"{datetime.now():%Y%m%d-%H%M%S}-{endpoint}-{int(elapsed_ms)}ms.folded"
+    path = os.path.join(app.config['PROFILING_DIR'], name)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(sampler.collapsed())
+    _prune_profiles(app.config['PROFILING_DIR'], app.config['PROFILING_MAX_FILES'])
+    return name
+
+
+def _prune_profiles(directory, max_files):
+    """Borra los perfiles más antiguos hasta dejar `max_files`."""
+    profiles = []
+    for name in os.listdir(directory):
+        if name.endswith('.folded'):
+            try:
+                profiles.append((os.stat(os.path.join(directory, name)).st_mtime, name))
+            except FileNotFoundError:
+                continue  # lo borró otro worker
+    profiles.sort(reverse=True)
+    for _, name in profiles[max_files:]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass
+
+
+def init_profiling(app):
+    """Registra los hooks de perfilado si PROFILING_ENABLED está activo."""
+    app.config.setdefault('PROFILING_ENABLED', False)
+    app.config.setdefault('PROFILING_DIR', os.path.join(app.instance_path, 'profiles'))
+    app.config.setdefault('PROFILING_SAMPLE_EVERY', 0)
+    app.config.setdefault('PROFILING_MIN_MS', 200)
+    app.config.setdefault('PROFILING_INTERVAL_MS', 5)
+    app.config.setdefault('PROFILING_MAX_FILES', 200)
+
+    if not app.config['PROFILING_ENABLED']:
+        return
+
+    os.makedirs(app.config['PROFILING_DIR'], exist_ok=True)
+    counter = itertools.count(1)
+
+    @app.before_request
+    def _start_profile():
+        profile, requested = _should_profile(app, counter)
+        if not profile:
+            return None
+        sampler = StackSampler(threading.get_ident(), app.config['PROFILING_INTERVAL_MS'] / 1000)
+        g._profile = (sampler, time.perf_counter(), requested)
+        sampler.start()
+        return None
+
+    @app.after_request
+    def _stop_profile(response):
+        state = g.pop('_profile', None)
+        if state is None:
+            return response
+        sampler, started, requested = state
+        sampler.stop()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if requested or elapsed_ms >= app.config['PROFILING_MIN_MS']:
+            try:
+                name = _write_profile(app, sampler, elapsed_ms)
+                if current_user.is_authenticated:
+                    response.headers['X-Profile-File'] = name
+            except OSError:
+                app.logger.exception('No se pudo guardar el perfil')
+        return response
+
+    @app.teardown_request
+    def _discard_profile(exc):
+        state = g.pop('_profile', None)
+        if state is not None:
+            state[0].stop()
+
+    @app.route('/panel/profiles')
+    @login_required
+    def list_profiles():
+        """Lista los perfiles guardados, del más reciente al más antiguo"""
+        directory = current_app.config['PROFILING_DIR']
+        entries = []
+        for name in os.listdir(directory):
+            if name.endswith('.folded'):
+                stat = os.stat(os.path.join(directory, name))
+                entries.append({'name': name, 'size': stat.st_size, 'mtime': datetime.fromtimestamp(stat.st_mtime)})
+        entries.sort(key=lambda e: e['mtime'], reverse=True)
+        return jsonify(entries)
+
+    @app.route('/panel/profiles/<path:name>')
+    @login_required
+    def download_profile(name):
+        return send_from_directory(current_app.config['PROFILING_DIR'], name, mimetype='text/plain')
@@ -0,0 +1,6 @@
+"""
+Paquete de repositorios (acceso a datos)
+"""
+from . import notice_repository
+
+__all__ = ['notice_repository']
@@ -0,0 +1,207 @@
+"""
+Repositorio de avisos.
+
+Todas las rutas leen y escriben la tabla `notice` a través de este módulo.
+Las lecturas usan cursores de tuplas y columnas explícitas para construir
+objetos Notice sin diccionarios intermedios; las escrituras se hacen en una
+sola transacción y usan lastrowid en vez de volver a consultar la tabla.
+
+Los avisos terminados hace tiempo se mueven a `notice_archive` con
+archive_expired(), para que `notice` solo contenga los vigentes y próximos.
+La tabla y el índice idx_notice_end_date se crean al archivar si la base de
+datos es anterior a database.sql.
+"""
+from datetime import datetime, timedelta
+import os
+
+from flask_app.config.mysqlconnection import connectToMySQL
+from flask_app.models.notice import Notice
+
+DB_NAME = os.environ.get('DB_NAME', 'panel_informativo')
+
+_SELECT = 'SELECT ' + Notice.COLUMNS + ' FROM notice'
+_SELECT_ARCHIVE = 'SELECT ' + Notice.COLUMNS + ' FROM notice_archive'
+
+# Misma definición que en database.sql
+_CREATE_ARCHIVE = (
+    'CREATE TABLE IF NOT EXISTS notice_archive ('
+    ' idnotice int NOT NULL,'
+    ' name_notice varchar(300) DEFAULT NULL,'
+    ' start_date datetime DEFAULT NULL,'
+    ' end_date datetime DEFAULT NULL,'
+    ' image_url varchar(300) DEFAULT NULL,'
+    ' archived_at datetime NOT NULL,'
+    ' PRIMARY KEY (idnotice),'
+    ' KEY idx_notice_archive_end_date (end_date)'
+    ') ENGINE=InnoDB DEFAULT CHARSET=utf8mb3'
+)
+_HAS_END_DATE_INDEX = (
+    'SELECT 1 FROM information_schema.statistics'
+    " WHERE table_schema = DATABASE() AND table_name = 'notice' AND index_name = 'idx_notice_end_date'"
+    ' LIMIT 1'
+)
+_CREATE_END_DATE_INDEX = 'CREATE INDEX idx_notice_end_date ON notice (end_date)'
+
+# Nombre del lock de MySQL (GET_LOCK) que evita archivar desde dos procesos a la vez
+ARCHIVE_LOCK = DB_NAME + '.archive_notices'
+
+# Columnas que pueden actualizarse: nombre del campo -> columna
+_UPDATABLE = {
+    'title': 'name_notice',
+    'start_date': 'start_date',
+    'end_date': 'end_date',
+    'image_url': 'image_url',
+}
+
+
+def _fetch(query, data=None, read_only=False):
+    db = connectToMySQL(DB_NAME, read_only=read_only)
+    try:
+        return [Notice.from_row(row) for row in db.fetch_rows(query, data)]
+    finally:
+        db.close()
+
+
+def list_notices(read_only=False):
+    """Todos los avisos, del más reciente al más antiguo."""
+    return _fetch(_SELECT + ' ORDER BY idnotice DESC', read_only=read_only)
+
+
+def list_by_start_date(limit, read_only=False, live_at=None):
+    """Los primeros `limit` avisos ordenados por fecha de inicio.
+
+    Con `live_at` solo los ya publicados en ese momento (sin fecha de inicio o
+    con fecha de inicio anterior).
+    """
+    if live_at is None:
+        return _fetch(_SELECT + ' ORDER BY start_date ASC LIMIT %(limit)s', {'limit': limit}, read_only=read_only)
+    return _fetch(
+        _SELECT + ' WHERE start_date IS NULL OR start_date <= %(now)s ORDER BY start_date ASC LIMIT %(limit)s',
+        {'limit': limit, 'now': live_at}, read_only=read_only
+    )
+
+
+def create_notice(title, start_date, end_date, image_url=None):
+    """Inserta un aviso y lo devuelve con el id asignado por la base de datos."""
+    db = connectToMySQL(DB_NAME)
+    try:
+        with db.transaction() as cursor:
+            cursor.execute(
+                'INSERT INTO notice (name_notice, start_date, end_date, image_url) '
+                'VALUES (%(name)s, %(start)s, %(end)s, %(img)s)',
+                {'name': title, 'start': start_date, 'end': end_date, 'img': image_url or None}
+            )
+            notice_id = cursor.lastrowid
+    finally:
+        db.close()
+    return Notice(notice_id, title, image_url or None, start_date, end_date)
+
+
+def update_notice(notice_id, **fields):
+    """Actualiza los campos indicados y devuelve el aviso resultante.
+
+    Devuelve None si el aviso no existe. La fila se bloquea con FOR UPDATE
+    para que el resultado refleje exactamente lo que quedó guardado.
+    """
+    fields = {k: v for k, v in fields.items() if k in _UPDATABLE}
+    db = connectToMySQL(DB_NAME)
+    try:
+        with db.transaction() as cursor:
+            cursor.execute(_SELECT + ' WHERE idnotice = %(id)s FOR UPDATE', {'id': notice_id})
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            notice = Notice.from_row(row)
+            if fields:
+                set_clauses = ', '.join(f'{_UPDATABLE[k]} = %({k})s' for k in fields)
+                cursor.execute(
+                    'UPDATE notice SET ' + set_clauses + ' WHERE idnotice = %(id)s',
+                    dict(fields, id=notice_id)
+                )
+                for key, value in fields.items():
+                    setattr(notice, key, value)
+    finally:
+        db.close()
+    return notice
+
+
+def delete_notice(notice_id):
+    """Elimina un aviso y lo devuelve (para limpiar su imagen), o None si no existe."""
+    db = connectToMySQL(DB_NAME)
+    try:
+        with db.transaction() as cursor:
+            cursor.execute(_SELECT + ' WHERE idnotice = %(id)s FOR UPDATE', {'id': notice_id})
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            cursor.execute('DELETE FROM notice WHERE idnotice = %(id)s', {'id': notice_id})
+    finally:
+        db.close()
+    return Notice.from_row(row)
+
+
+def archive_expired(days, batch_size=500):
+    """Mueve a notice_archive los avisos cuyo end_date pasó hace más de `days` días.
+
+    Devuelve los avisos archivados, o None si otro proceso ya está archivando.
+    Cada lote de `batch_size` filas va en su propia transacción para no
+    mantener bloqueos largos sobre `notice`. La imagen se conserva: la
+    referencia viaja con la fila. Si `notice_archive` o el índice de
+    `notice.end_date` no existen (bases de datos creadas antes) se crean
+    antes del primer lote.
+    """
+    cutoff = datetime.now() - timedelta(days=days)
+    archived = []
+    db = connectToMySQL(DB_NAME)
+    try:
+        locked = db.fetch_rows('SELECT GET_LOCK(%(name)s, 0)', {'name': ARCHIVE_LOCK})
+        if not locked or locked[0][0] != 1:
+            return None
+        try:
+            with db.transaction() as cursor:
+                cursor.execute(_CREATE_ARCHIVE)
+                # MySQL no admite CREATE INDEX IF NOT EXISTS
+                cursor.execute(_HAS_END_DATE_INDEX)
+                if not cursor.fetchone():
+                    cursor.execute(_CREATE_END_DATE_INDEX)
+            while True:
+                with db.transaction() as cursor:
+                    cursor.execute(
+                        _SELECT + ' WHERE end_date < %(cutoff)s ORDER BY idnotice LIMIT %(limit)s FOR UPDATE',
+                        {'cutoff': cutoff, 'limit': batch_size}
+                    )
+                    rows = cursor.fetchall()
+                    if rows:
+                        ids = [row[0] for row in rows]
+                        cursor.execute(
+                            'REPLACE INTO notice_archive '
+                            '(idnotice, name_notice, start_date, end_date, image_url, archived_at) '
+                            'SELECT idnotice, name_notice, start_date, end_date, image_url, %(now)s '
+                            'FROM notice WHERE idnotice IN %(ids)s',
+                            {'ids': ids, 'now': datetime.now()}
+                        )
+                        cursor.execute('DELETE FROM notice WHERE idnotice IN %(ids)s', {'ids': ids})
+                archived.extend(Notice.from_row(row) for row in rows)
+                if len(rows) < batch_size:
+                    break
+        finally:
+            db.fetch_rows('SELECT RELEASE_LOCK(%(name)s)', {'name': ARCHIVE_LOCK})
+    finally:
+        db.close()
+    return archived
+
+
+def list_archived(limit=50, offset=0, read_only=True):
+    """Avisos archivados, del que terminó más recientemente al más antiguo."""
+    return _fetch(
+        _SELECT_ARCHIVE + ' ORDER BY end_date DESC, idnotice DESC LIMIT %(limit)s OFFSET %(offset)s',
+        {'limit': limit, 'offset': offset}, read_only=read_only
+    )
+
+
+def count_archived(read_only=True):
+    db = connectToMySQL(DB_NAME, read_only=read_only)
+    try:
+        return db.fetch_rows('SELECT COUNT(*) FROM notice_archive')[0][0]
+    finally:
+        db.close()
@@ -0,0 +1,195 @@
+"""
+Caché compartida entre los workers de un mismo host (avisos y clima).
+
+Cada entrada vive en un fichero mapeado en memoria (SHARED_CACHE_DIR, por
+defecto en /dev/shm) con una cabecera fija seguida del payload serializado:
+
+    seq (u64) | version (u64) | published_at (f64) | length (u32) | payload
+
+El payload es JSON en UTF-8, nunca pickle: los bytes del mmap se tratan
+como datos no confiables. El directorio se crea con permisos 0o700 y, si ya
+existe y pertenece a otro usuario o es accesible por otros, la caché queda
+desactivada (ver private_dir.py).
+
+- Escritura: un solo escritor a la vez, bajo fcntl.flock. El escritor pone
+  `seq` en impar, copia el payload, incrementa `version` y deja `seq` en par
+  (seqlock).
+- Lectura: sin locks. Se lee `seq`; si es el mismo que la última lectura se
+  devuelve el objeto ya deserializado de este proceso, sin copiar nada. Si
+  cambió, se copia el payload y se vuelve a comprobar `seq` para descartar
+  lecturas a medio escribir.
+
+Cualquier worker que obtiene datos nuevos (de MySQL u Open-Meteo) los
+publica, así que todos los workers ven la misma versión. En plataformas sin
+fcntl la caché queda desactivada y las lecturas devuelven None.
+"""
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+from flask_app.private_dir import InsecureDirectory, ensure_private_dir
+from flask_app.snapshot import notices_from_rows, notices_to_rows
+
+_SEQ = struct.Struct('<Q')
+_META = struct.Struct('<QdI')  # version, published_at, length
+HEADER_SIZE = 32
+READ_RETRIES = 100
+
+
+def default_dir():
+    base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(base, 'panel_informativo_cache')
+
+
+class SharedEntry:
+    __slots__ = ('version', 'published_at', 'value')
+
+    def __init__(self, version, published_at, value):
+        self.version = version
+        self.published_at = published_at
+        self.value = value
+
+    def age(self):
+        return time.time() - self.published_at
+
+
+class SharedSlot:
+    """Una entrada de la caché: un fichero mapeado y su última lectura."""
+
+    def __init__(self, name, encode=None, decode=None):
+        self.name = name
+        self.encode = encode or (lambda value: value)
+        self.decode = decode or (lambda value: value)
+        self.size = 0
+        self._mm = None
+        self._lock_path = None
+        # (seq, SharedEntry) de la última lectura; se reemplaza de una vez
+        self._cached = (None, None)
+        self._write_lock = threading.Lock()
+
+    def configure(self, directory, size):
+        if fcntl is None or not directory:
+            self._mm = None
+            return
+        try:
+            ensure_private_dir(directory)
+        except InsecureDirectory as e:
+            print(f"Caché compartida '{self.name}' desactivada: {e}")
+            self._mm = None
+            return
+        path = os.path.join(directory, self.name + '.mmap')
+        self._lock_path = path + '.lock'
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        try:
+            if hasattr(os, 'getuid') and os.fstat(fd).st_uid != os.getuid():
+                print(f"Caché compartida '{self.name}' desactivada: {path} pertenece a otro usuario")
+                self._mm = None
+                return
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            self.size = os.fstat(fd).st_size
+            self._mm = mmap.mmap(fd, self.size)
+        finally:
+            os.close(fd)
+        self._cached = (None, None)
+
+    def read(self):
+        """Devuelve el SharedEntry publicado, o None si no hay (o no se pudo leer)."""
+        mm = self._mm
+        if mm is None:
+            return None
+        seq = _SEQ.unpack_from(mm, 0)[0]
+        cached_seq, entry = self._cached
+        if seq == cached_seq:
+            return entry
+
+        for _ in range(READ_RETRIES):
+            seq = _SEQ.unpack_from(mm, 0)[0]
+            if seq % 2:
+                time.sleep(0)  # escritura en curso
+                continue
+            version, published_at, length = _META.unpack_from(mm, _SEQ.size)
+            if HEADER_SIZE + length > self.size:
+                continue
+            payload = mm[HEADER_SIZE:HEADER_SIZE + length]
+            if _SEQ.unpack_from(mm, 0)[0] != seq:
+                continue
+            break
+        else:
+            return None
+
+        if version == 0:
+            entry = None
+        else:
+            try:
+                entry = SharedEntry(version, published_at, self.decode(json.loads(payload)))
+            except (ValueError, TypeError, IndexError):
+                return None
+        self._cached = (seq, entry)
+        return entry
+
+    def fresh(self, max_age):
+        """El valor publicado si tiene menos de `max_age` segundos, si no None."""
+        entry = self.read()
+        if entry is None or entry.age() > max_age:
+            return None
+        return entry.value
+
+    def publish(self, value):
+        """Publica un valor nuevo; devuelve su versión (None si la caché está desactivada)."""
+        mm = self._mm
+        if mm is None:
+            return None
+        payload = json.dumps(self.encode(value), separators=(',', ':')).encode('utf-8')
+        if HEADER_SIZE + len(payload) > self.size:
+            raise ValueError(f'{self.name}: {len(payload)} bytes no caben en la caché compartida')
+
+        with self._write_lock, open(self._lock_path, 'a+b') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                seq = _SEQ.unpack_from(mm, 0)[0]
+                # Un escritor que murió a medias deja seq impar: se reutiliza
+                writing = seq if seq % 2 else seq + 1
+                version = _META.unpack_from(mm, _SEQ.size)[0] + 1
+                _SEQ.pack_into(mm, 0, writing)
+                mm[HEADER_SIZE:HEADER_SIZE + len(payload)] = payload
+                _META.pack_into(mm, _SEQ.size, version, time.time(), len(payload))
+                _SEQ.pack_into(mm, 0, writing + 1)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return version
+
+    def status(self):
+        entry = self.read()
+        if entry is None:
+            return {'enabled': self._mm is not None, 'version': None, 'age': None}
+        return {'enabled': True, 'version': entry.version, 'age': round(entry.age(), 1)}
+
+
+def _decode_notices(rows):
+    return tuple(notices_from_rows(rows))
+
+
+class SharedCache:
+    def __init__(self):
+        self.notices = SharedSlot('notices', notices_to_rows, _decode_notices)
+        self.clima = SharedSlot('clima')
+
+    def configure(self, directory, size):
+        for slot in (self.notices, self.clima):
+            slot.configure(directory, size)
+
+    def status(self):
+        return {'notices': self.notices.status(), 'clima': self.clima.status()}
+
+
+shared_cache = SharedCache()
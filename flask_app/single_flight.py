@@ -0,0 +1,140 @@
+"""
+Coalescencia de cargas costosas ("single flight").
+
+Cuando varias peticiones piden a la vez el mismo dato que no está en caché
+(p.ej. todas las pantallas recargando avisos justo después de una edición),
+solo una ejecuta la carga y el resto espera su resultado.
+
+- Dentro de un worker: los hilos que piden la misma clave mientras hay una
+  carga en curso esperan a que termine y reciben el mismo resultado (o la
+  misma excepción).
+- Entre workers del mismo host: la carga se hace bajo un lock de fichero
+  (fcntl.flock) en SINGLE_FLIGHT_DIR. El worker que la ejecuta deja el
+  resultado en JSON junto al lock (con `encode`/`decode` para lo que no es
+  JSON nativo, p.ej. avisos); los que esperaban en el lock lo reutilizan si
+  tiene menos de `share_for` segundos. En plataformas sin fcntl solo se
+  coalesce dentro del worker.
+
+SINGLE_FLIGHT_DIR tiene que ser un directorio privado (0o700, del usuario
+del proceso); si no lo es, solo se coalesce dentro del worker. Los
+resultados nunca se deserializan con pickle.
+"""
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+from flask_app.private_dir import InsecureDirectory, ensure_private_dir
+
+
+def _identity(value):
+    return value
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, lock_dir=None):
+        self.lock_dir = lock_dir
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def configure(self, lock_dir):
+        if lock_dir:
+            try:
+                ensure_private_dir(lock_dir)
+            except InsecureDirectory as e:
+                print("Single flight entre workers desactivado:", e)
+                lock_dir = None
+        self.lock_dir = lock_dir
+
+    def do(self, key, fn, share_for=0, encode=None, decode=None):
+        """Ejecuta fn() una sola vez para todas las llamadas concurrentes con `key`.
+
+        `share_for` (segundos) permite a otros workers reutilizar el resultado
+        recién calculado en vez de repetir la carga; con 0 solo se coalesce
+        dentro del proceso. `encode`/`decode` convierten el resultado a y
+        desde un valor JSON.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run(key, fn, share_for, encode or _identity, decode or _identity)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def _run(self, key, fn, share_for, encode, decode):
+        if fcntl is None or not self.lock_dir or share_for <= 0:
+            return fn()
+
+        base = os.path.join(self.lock_dir, re.sub(r'[^A-Za-z0-9_.-]', '_', key))
+        with open(base + '.lock', 'a+b') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                shared = self._read_shared(base + '.json', share_for, decode)
+                if shared is not None:
+                    return shared[0]
+                result = fn()
+                self._write_shared(base + '.json', encode(result))
+                return result
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _read_shared(path, share_for, decode):
+        try:
+            if time.time() - os.path.getmtime(path) > share_for:
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                return (decode(json.load(f)),)
+        except (OSError, ValueError, TypeError, IndexError):
+            return None
+
+    @staticmethod
+    def _write_shared(path, value):
+        try:
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(value, f, separators=(',', ':'), ensure_ascii=False)
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError):
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+
+single_flight = SingleFlight()
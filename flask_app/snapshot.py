@@ -0,0 +1,127 @@
+"""
+Copia en disco de los últimos avisos y clima obtenidos correctamente.
+
+Cada vez que la lista de avisos o el clima cambian se reescribe el fichero
+SNAPSHOT_PATH de forma atómica (fichero temporal + os.replace), en JSON
+compacto. Al arrancar la aplicación se carga antes de la primera consulta a
+la base de datos, y las vistas públicas lo sirven como datos "stale" cuando
+MySQL o Open-Meteo no responden, para que las pantallas sigan mostrando
+contenido real en lugar de un mensaje de error.
+"""
+from datetime import datetime
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from flask_app.models.notice import Notice
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_dt(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+def _fmt_dt(value):
+    return value.isoformat() if value else None
+
+
+def notices_to_rows(notices):
+    """Avisos como listas JSON: [id, título, imagen, inicio ISO, fin ISO]."""
+    return [[n.id, n.title, n.image_url, _fmt_dt(n.start_date), _fmt_dt(n.end_date)] for n in notices]
+
+
+def notices_from_rows(rows):
+    """Inverso de notices_to_rows(); lanza ValueError/TypeError/IndexError si no encajan."""
+    return [Notice(row[0], row[1], row[2], _parse_dt(row[3]), _parse_dt(row[4])) for row in rows]
+
+
+def by_start_date(notices, limit):
+    """Equivalente a ORDER BY start_date ASC LIMIT n (NULL primero, como MySQL)."""
+    ordered = sorted(notices or [], key=lambda n: (n.start_date is not None, n.start_date or datetime.min))
+    return ordered[:limit]
+
+
+class LastKnownGood:
+    def __init__(self, path=None):
+        self.path = path
+        self.notices = None
+        self.notices_saved_at = None
+        self.clima = None
+        self.clima_saved_at = None
+        self._fingerprint = None
+        self._lock = threading.Lock()
+
+    def configure(self, path):
+        self.path = path
+        if path:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            self.load()
+
+    def load(self):
+        """Carga el fichero si existe; un fichero corrupto se ignora."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            notices = notices_from_rows(data.get('notices') or [])
+        except (OSError, ValueError, TypeError, IndexError):
+            return False
+        with self._lock:
+            if data.get('notices') is not None:
+                self.notices = notices
+                self.notices_saved_at = data.get('notices_saved_at')
+                self._fingerprint = tuple(n.astuple() for n in notices)
+            self.clima = data.get('clima')
+            self.clima_saved_at = data.get('clima_saved_at')
+        return True
+
+    def update_notices(self, notices):
+        """Registra una lista de avisos recién leída de la base de datos."""
+        fingerprint = tuple(n.astuple() for n in notices)
+        if fingerprint == self._fingerprint:
+            return
+        with self._lock:
+            self.notices = list(notices)
+            self.notices_saved_at = time.time()
+            self._fingerprint = fingerprint
+        self._save()
+
+    def update_clima(self, clima):
+        """Registra un clima recién obtenido de Open-Meteo."""
+        if clima == self.clima:
+            return
+        with self._lock:
+            self.clima = dict(clima)
+            self.clima_saved_at = time.time()
+        self._save()
+
+    def notices_age(self):
+        """Segundos desde que se guardó la lista de avisos."""
+        return int(time.time() - self.notices_saved_at) if self.notices_saved_at else None
+
+    def _save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = {
+                'notices': notices_to_rows(self.notices) if self.notices is not None else None,
+                'notices_saved_at': self.notices_saved_at,
+                'clima': self.clima,
+                'clima_saved_at': self.clima_saved_at,
+            }
+        tmp = None
+        try:
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or '.', suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'), ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning('No se pudo guardar la copia de avisos en %s: %s', self.path, e)
+            if tmp and os.path.exists(tmp):
+                os.remove(tmp)
+
+
+last_known_good = LastKnownGood()
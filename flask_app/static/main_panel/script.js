@@ -2,13 +2,283 @@
 let avisos = [];
 let avisosEnPantalla = [];
 let currentAvisoIndex = 0;
-let rotationInterval;
-let hashPollInterval;
+let tareaRotacion = null;
 let ultimoHashAvisos = null;
 let currentMainCardId = null;  // Para evitar duplicados con el recuadro principal
 let usedAvisoIds = new Set();  // Para rastrear avisos ya mostrados
 let mainCardRotationIndex = 0;  // Índice específico para el recuadro principal
 
+// Caché de imágenes precargadas y decodificadas (LRU de object URLs)
+const IMAGEN_POR_DEFECTO = '/static/main_panel/img/logo.png';
+const IMAGENES_POR_ADELANTADO = 4;  // Rotaciones que se preparan por adelantado
+const MAX_IMAGENES_LISTAS = 8;      // Tope de imágenes decodificadas en memoria
+const PRECARGA_INICIAL_MAX_MS = 3000;
+const imagenesListas = new Map();   // url original -> {promesa, src, objectUrl, img}; orden = LRU
+// URLs que fetch no puede leer (servidores externos sin CORS): se precargan
+// con un <img>. Y URLs que no cargaron de ninguna forma, con la hora del
+// fallo, para no reintentarlas antes de REINTENTO_IMAGEN_MS.
+const imagenesSinFetch = new Set();
+const imagenesFallidas = new Map();
+const REINTENTO_IMAGEN_MS = 600000;
+
+// Intervalos de las tareas periódicas de la pantalla
+const INTERVALO_ROTACION = 8000;
+const INTERVALO_HASH = 60000;
+const INTERVALO_CLIMA = 600000;
+const RETARDO_CARGA_AVISOS = 2000;
+
+// Avisos programados (aún no publicados). Se consultan cada pocos minutos;
+// sus imágenes se descargan en momentos de reposo, repartidas en el tiempo
+// para que no coincidan todas las pantallas, se decodifican poco antes de
+// la hora y el aviso entra en la rotación justo a su hora.
+const INTERVALO_PROGRAMADOS = 300000;
+const DISPERSION_DESCARGA_MS = 120000;
+const ANTELACION_DECODIFICAR_MS = 10000;
+let tareasProgramados = [];
+// id -> { aviso, hora } de las publicaciones programadas que aún no se hicieron
+const publicacionesPendientes = new Map();
+const imagenesDescargadas = new Set();
+
+// Telemetría de la pantalla. Las métricas se acumulan aquí como
+// [veces, suma, máximo] y se envían en un solo lote por minuto (y al cerrar
+// la página) a /panel/telemetry. La pantalla se identifica con ?pantalla=
+// en la URL o, si no, con un id aleatorio guardado en localStorage.
+// La exportación estática marca la página con data-telemetria="0" cuando no
+// hay backend detrás que reciba los lotes.
+const TELEMETRIA_ACTIVA = !(document.body && document.body.dataset && document.body.dataset.telemetria === '0');
+const INTERVALO_TELEMETRIA = 60000;
+const MAX_ERRORES_TELEMETRIA = 20;
+const CUADRO_LENTO_MS = 50;
+const telemetria = { metricas: {}, errores: [] };
+const PANTALLA_ID = obtenerIdPantalla();
+
+function obtenerIdPantalla() {
+    const porUrl = new URLSearchParams(window.location.search).get('pantalla');
+    if (porUrl) return porUrl.slice(0, 64);
+    try {
+        let id = localStorage.getItem('panel_pantalla_id');
+        if (!id) {
+            id = Math.random().toString(36).slice(2, 10);
+            localStorage.setItem('panel_pantalla_id', id);
+        }
+        return id;
+    } catch (error) {
+        return 'sin_id';
+    }
+}
+
+function registrarMetrica(nombre, valor) {
+    const metrica = telemetria.metricas[nombre];
+    if (metrica) {
+        metrica[0] += 1;
+        metrica[1] += valor;
+        if (valor > metrica[2]) metrica[2] = valor;
+    } else {
+        telemetria.metricas[nombre] = [1, valor, valor];
+    }
+}
+
+function registrarError(mensaje) {
+    if (telemetria.errores.length < MAX_ERRORES_TELEMETRIA) {
+        telemetria.errores.push(String(mensaje).slice(0, 300));
+    } else {
+        registrarMetrica('errores_descartados', 1);
+    }
+}
+
+// fetch() que registra la latencia (o el error) como fetch_<nombre>_ms
+async function fetchMedido(nombre, url) {
+    const inicio = performance.now();
+    try {
+        const response = await fetch(url);
+        registrarMetrica(`fetch_${nombre}_ms`, performance.now() - inicio);
+        if (!response.ok) registrarError(`${url}: HTTP ${response.status}`);
+        return response;
+    } catch (error) {
+        registrarError(`${url}: ${error}`);
+        throw error;
+    }
+}
+
+// Tarea de envío de la telemetría. Se envía aunque no haya métricas: el
+// lote sirve también de latido de la pantalla.
+function enviarTelemetria(alCerrar = false) {
+    if (!TELEMETRIA_ACTIVA) return;
+    const redondear = v => Math.round(v * 10) / 10;
+    const metricas = {};
+    Object.entries(telemetria.metricas).forEach(([nombre, [veces, suma, maximo]]) => {
+        metricas[nombre] = [veces, redondear(suma), redondear(maximo)];
+    });
+    const lote = JSON.stringify({
+        pantalla: PANTALLA_ID,
+        uptime: Math.round(performance.now() / 1000),
+        memoria: performance.memory ? performance.memory.usedJSHeapSize : null,
+        metricas,
+        errores: telemetria.errores,
+    });
+    telemetria.metricas = {};
+    telemetria.errores = [];
+    
+    if (alCerrar && navigator.sendBeacon) {
+        navigator.sendBeacon('/panel/telemetry', new Blob([lote], { type: 'application/json' }));
+        return;
+    }
+    fetch('/panel/telemetry', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: lote,
+        keepalive: true,
+    })
+        .then(response => {
+            if (!response.ok) console.warn('Telemetría rechazada:', response.status);
+        })
+        .catch(error => {
+            // El lote se pierde; se cuenta en el siguiente
+            console.warn('No se pudo enviar la telemetría:', error);
+            registrarMetrica('telemetria_fallida', 1);
+        });
+}
+
+window.addEventListener('error', event => {
+    registrarError(`${event.message} (${event.filename}:${event.lineno})`);
+});
+window.addEventListener('unhandledrejection', event => {
+    registrarError(`Promesa rechazada: ${event.reason}`);
+});
+window.addEventListener('pagehide', () => enviarTelemetria(true));
+
+// Planificador único de la pantalla.
+//
+// El reloj, la rotación, el clima y la comprobación de cambios se ejecutan
+// desde un solo temporizador que despierta cuando vence la próxima tarea y
+// hace el trabajo dentro de un requestAnimationFrame. Cada tarea lee del DOM
+// lo que necesita y devuelve una función que escribe; en cada cuadro se hacen
+// primero todas las lecturas y después todas las escrituras, sin forzar
+// recálculos de layout intercalados. Con la página oculta no se programa
+// nada y al volver se ponen al día las tareas vencidas.
+const planificador = {
+    tareas: [],
+    temporizador: null,
+    cuadroPendiente: false,
+    escrituras: [],
+};
+
+function calcularProximaEjecucion(tarea, ahora) {
+    if (tarea.alinear) {
+        // Siguiente múltiplo exacto del intervalo (p.ej. el próximo cambio de minuto)
+        return (Math.floor(ahora / tarea.intervaloMs) + 1) * tarea.intervaloMs;
+    }
+    return ahora + tarea.intervaloMs;
+}
+
+// Registra una tarea periódica. fn(ahora) puede devolver una función que
+// escribe en el DOM; se ejecuta en la fase de escritura del mismo cuadro.
+// Opciones: inmediata (primera ejecución ya), alinear (a múltiplos del
+// intervalo), retardo (primera ejecución tras N ms), unaVez.
+function programarTarea(nombre, intervaloMs, fn, opciones = {}) {
+    const tarea = {
+        nombre,
+        intervaloMs,
+        fn,
+        alinear: Boolean(opciones.alinear),
+        unaVez: Boolean(opciones.unaVez),
+        proxima: 0,
+    };
+    const ahora = Date.now();
+    if (opciones.inmediata) {
+        tarea.proxima = ahora;
+    } else if (opciones.retardo !== undefined) {
+        tarea.proxima = ahora + opciones.retardo;
+    } else {
+        tarea.proxima = calcularProximaEjecucion(tarea, ahora);
+    }
+    planificador.tareas.push(tarea);
+    despertarPlanificador();
+    return tarea;
+}
+
+function cancelarTarea(tarea) {
+    planificador.tareas = planificador.tareas.filter(t => t !== tarea);
+    despertarPlanificador();
+}
+
+// Pide una escritura en el próximo cuadro (p.ej. al llegar datos de la red)
+function encolarEscritura(escribir) {
+    planificador.escrituras.push(escribir);
+    if (!document.hidden) pedirCuadro();
+}
+
+function pedirCuadro() {
+    if (planificador.cuadroPendiente) return;
+    planificador.cuadroPendiente = true;
+    requestAnimationFrame(ejecutarCuadro);
+}
+
+function despertarPlanificador() {
+    clearTimeout(planificador.temporizador);
+    planificador.temporizador = null;
+    if (document.hidden) return;
+    if (planificador.escrituras.length) pedirCuadro();
+    if (planificador.tareas.length === 0) return;
+    const proxima = Math.min(...planificador.tareas.map(t => t.proxima));
+    planificador.temporizador = setTimeout(pedirCuadro, Math.max(0, proxima - Date.now()));
+}
+
+function ejecutarCuadro() {
+    const inicioCuadro = performance.now();
+    planificador.cuadroPendiente = false;
+    const ahora = Date.now();
+    const escrituras = planificador.escrituras.splice(0);
+
+    // Fase de lectura: las tareas vencidas leen el DOM y devuelven su escritura
+    planificador.tareas.slice().forEach(tarea => {
+        if (tarea.proxima > ahora) return;
+        if (tarea.unaVez) {
+            planificador.tareas = planificador.tareas.filter(t => t !== tarea);
+        } else {
+            tarea.proxima = calcularProximaEjecucion(tarea, ahora);
+        }
+        try {
+            const escribir = tarea.fn(ahora);
+            if (typeof escribir === 'function') escrituras.push(escribir);
+        } catch (error) {
+            console.error(`Error en la tarea ${tarea.nombre}:`, error);
+            registrarError(`Tarea ${tarea.nombre}: ${error}`);
+        }
+    });
+
+    // Fase de escritura
+    escrituras.forEach(escribir => {
+        try {
+            escribir();
+        } catch (error) {
+            console.error('Error actualizando la pantalla:', error);
+            registrarError(`Escritura: ${error}`);
+        }
+    });
+
+    const duracion = performance.now() - inicioCuadro;
+    registrarMetrica('cuadro_ms', duracion);
+    if (duracion > CUADRO_LENTO_MS) registrarMetrica('cuadro_lento_ms', duracion);
+    despertarPlanificador();
+}
+
+document.addEventListener('visibilitychange', () => {
+    if (document.hidden) {
+        clearTimeout(planificador.temporizador);
+        planificador.temporizador = null;
+    } else {
+        despertarPlanificador();
+    }
+});
+
+// Reinicia una animación CSS: se quita la clase ahora y se vuelve a poner en
+// el cuadro siguiente, sin forzar un reflow con offsetWidth
+function reiniciarAnimacion(elementos, clase) {
+    elementos.forEach(el => el.classList.remove(clase));
+    encolarEscritura(() => elementos.forEach(el => el.classList.add(clase)));
+}
+
 // Función auxiliar para validar y parsear JSON de forma segura
 async function parseJsonSafely(response) {
     try {
@@ -17,83 +287,225 @@ async function parseJsonSafely(response) {
             console.warn('Respuesta no es JSON. Content-Type:', contentType);
             const text = await response.text();
             console.warn('Contenido de respuesta:', text.substring(0, 200));
+            registrarError(`${response.url}: respuesta no JSON (${contentType})`);
             return null;
         }
         return await response.json();
     } catch (error) {
         console.error('Error parseando JSON:', error);
+        registrarError(`${response.url}: JSON inválido: ${error}`);
         return null;
     }
 }
 
-// Función para actualizar hora y fecha con animaciones suaves
+// URL de la imagen de un aviso (o el logo si no tiene)
+function urlImagenAviso(aviso) {
+    return aviso && aviso.image_url && aviso.image_url.trim() !== ''
+        ? aviso.image_url
+        : IMAGEN_POR_DEFECTO;
+}
+
+// Descarga y decodifica una imagen fuera de pantalla. Se guarda un object URL
+// y el <img> decodificado para que el cambio de fondo no espere a la red ni
+// a la decodificación.
+function precargarImagen(url) {
+    const existente = imagenesListas.get(url);
+    if (existente) {
+        // Marcar como usada recientemente
+        imagenesListas.delete(url);
+        imagenesListas.set(url, existente);
+        return existente.promesa;
+    }
+    const fallo = imagenesFallidas.get(url);
+    if (fallo !== undefined && Date.now() - fallo < REINTENTO_IMAGEN_MS) {
+        return Promise.resolve();
+    }
+
+    const entrada = { promesa: null, src: null, objectUrl: null, img: null };
+    const carga = imagenesSinFetch.has(url) ? precargarConImg(url, entrada) : precargarConFetch(url, entrada);
+    entrada.promesa = carga
+        .then(() => imagenesFallidas.delete(url))
+        .catch(error => {
+            // Se recuerda el fallo para no volver a pedirla en cada rotación
+            console.warn('No se pudo precargar la imagen', url, error);
+            registrarError(`Imagen ${url}: ${error}`);
+            imagenesFallidas.set(url, Date.now());
+            if (imagenesListas.get(url) === entrada) imagenesListas.delete(url);
+        });
+
+    imagenesListas.set(url, entrada);
+    recortarImagenesListas();
+    return entrada.promesa;
+}
+
+function precargarConFetch(url, entrada) {
+    const inicio = performance.now();
+    return fetch(url)
+        .then(response => {
+            if (!response.ok) throw new Error(`Error HTTP: ${response.status}`);
+            return response.blob();
+        })
+        .then(blob => {
+            const descargada = performance.now();
+            registrarMetrica('imagen_descarga_ms', descargada - inicio);
+            const objectUrl = URL.createObjectURL(blob);
+            const img = new Image();
+            img.src = objectUrl;
+            return img.decode().then(() => {
+                registrarMetrica('imagen_decodificacion_ms', performance.now() - descargada);
+                guardarImagenLista(url, entrada, img, objectUrl);
+            }, error => {
+                URL.revokeObjectURL(objectUrl);
+                throw error;
+            });
+        }, () => {
+            // Imágenes externas sin CORS: fetch no puede leerlas pero un <img> sí
+            imagenesSinFetch.add(url);
+            return precargarConImg(url, entrada);
+        });
+}
+
+// Precarga con un <img> normal: el navegador guarda la imagen decodificada
+// mientras haya una referencia y el fondo usa la URL original
+function precargarConImg(url, entrada) {
+    const inicio = performance.now();
+    const img = new Image();
+    img.src = url;
+    return img.decode().then(() => {
+        registrarMetrica('imagen_img_ms', performance.now() - inicio);
+        guardarImagenLista(url, entrada, img, null);
+    });
+}
+
+function guardarImagenLista(url, entrada, img, objectUrl) {
+    if (imagenesListas.get(url) !== entrada) {
+        // Se liberó mientras se descargaba
+        if (objectUrl) URL.revokeObjectURL(objectUrl);
+        return;
+    }
+    entrada.objectUrl = objectUrl;
+    entrada.src = objectUrl || url;
+    entrada.img = img;
+}
+
+// URL para poner en pantalla: la versión ya decodificada si está lista,
+// si no la original (y se deja precargando para la próxima vez)
+function urlImagenLista(url) {
+    const entrada = imagenesListas.get(url);
+    if (entrada && entrada.src) {
+        imagenesListas.delete(url);
+        imagenesListas.set(url, entrada);
+        return entrada.src;
+    }
+    precargarImagen(url);
+    return url;
+}
+
+function liberarImagen(url) {
+    const entrada = imagenesListas.get(url);
+    if (!entrada) return;
+    imagenesListas.delete(url);
+    if (entrada.objectUrl) URL.revokeObjectURL(entrada.objectUrl);
+    entrada.img = null;
+}
+
+// Imágenes que se ven ahora mismo (no se pueden liberar)
+function imagenesEnUso() {
+    const enUso = new Set();
+    document.querySelectorAll('.main-card, .side-card').forEach(card => {
+        const url = card.dataset.imagenOriginal;
+        if (url) enUso.add(url);
+    });
+    return enUso;
+}
+
+// Mantiene la caché por debajo de MAX_IMAGENES_LISTAS, descartando las menos usadas
+function recortarImagenesListas() {
+    if (imagenesListas.size <= MAX_IMAGENES_LISTAS) return;
+    const enUso = imagenesEnUso();
+    for (const url of imagenesListas.keys()) {
+        if (imagenesListas.size <= MAX_IMAGENES_LISTAS) break;
+        if (!enUso.has(url)) liberarImagen(url);
+    }
+}
+
+// Libera las imágenes de avisos que ya no están en avisosEnPantalla
+function liberarImagenesFuera() {
+    const vigentes = new Set((avisosEnPantalla.length ? avisosEnPantalla : avisos).map(urlImagenAviso));
+    vigentes.add(IMAGEN_POR_DEFECTO);
+    const enUso = imagenesEnUso();
+    Array.from(imagenesListas.keys()).forEach(url => {
+        if (!vigentes.has(url) && !enUso.has(url)) liberarImagen(url);
+    });
+}
+
+// Precarga las imágenes de las próximas rotaciones (principal + laterales)
+function precargarSiguientes() {
+    const fuente = avisosEnPantalla.length ? avisosEnPantalla : avisos;
+    if (fuente.length === 0) return Promise.resolve();
+    const avisosPriorizados = priorizarAvisosDeHoy(fuente);
+    const laterales = document.querySelectorAll('.side-card').length;
+    const cantidad = Math.min(avisosPriorizados.length, IMAGENES_POR_ADELANTADO + laterales);
+    const promesas = [];
+    for (let i = 1; i <= cantidad; i++) {
+        const aviso = avisosPriorizados[(mainCardRotationIndex + i) % avisosPriorizados.length];
+        promesas.push(precargarImagen(urlImagenAviso(aviso)));
+    }
+    return Promise.all(promesas);
+}
+
+// Pone una imagen de fondo en una tarjeta usando la versión precargada.
+// La imagen visible es la capa ::before, que lee la variable --bg-url.
+function ponerImagenTarjeta(card, url) {
+    card.dataset.imagenOriginal = url;
+    card.style.removeProperty('background-image');
+    card.style.setProperty('--bg-url', `url('${urlImagenLista(url)}')`);
+}
+
+// Tarea del reloj: lee la hora y fecha mostradas y devuelve la escritura
+// solo si cambiaron (se ejecuta en cada cambio de minuto)
 function actualizarHoraFecha() {
-    try {
-        const ahora = new Date();
-        const horaElement = document.getElementById('hora-actual');
-        const fechaElement = document.getElementById('fecha-actual');
-        
-        // Debug: verificar si los elementos existen
-        if (!horaElement) {
-            console.error('Elemento hora-actual no encontrado');
-            return;
-        }
-        if (!fechaElement) {
-            console.error('Elemento fecha-actual no encontrado');
-            return;
-        }
-        
-        // Hora
-        let horas = ahora.getHours();
-        const minutos = ahora.getMinutes().toString().padStart(2, '0');
-        const ampm = horas >= 12 ? 'PM' : 'AM';
-        horas = horas % 12;
-        horas = horas ? horas : 12;
-        const textoPlano = horas + ':' + minutos + ' ' + ampm;
-        
-        // Actualizar hora inmediatamente si está vacía
-        if (!horaElement.textContent.trim()) {
+    const horaElement = document.getElementById('hora-actual');
+    const fechaElement = document.getElementById('fecha-actual');
+    if (!horaElement || !fechaElement) {
+        console.error('Elementos hora-actual/fecha-actual no encontrados');
+        return null;
+    }
+
+    const ahora = new Date();
+
+    // Hora
+    let horas = ahora.getHours();
+    const minutos = ahora.getMinutes().toString().padStart(2, '0');
+    const ampm = horas >= 12 ? 'PM' : 'AM';
+    horas = horas % 12;
+    horas = horas ? horas : 12;
+    const textoPlano = horas + ':' + minutos + ' ' + ampm;
+
+    // Fecha
+    const dia = ahora.getDate().toString().padStart(2, '0');
+    const mes = (ahora.getMonth() + 1).toString().padStart(2, '0');
+    const anio = ahora.getFullYear();
+    const nuevaFecha = dia + '/' + mes + '/' + anio;
+
+    const cambiaHora = horaElement.textContent.trim() !== textoPlano;
+    const cambiaFecha = fechaElement.textContent.trim() !== nuevaFecha;
+    if (!cambiaHora && !cambiaFecha) return null;
+
+    return () => {
+        if (cambiaHora) {
             horaElement.innerHTML = '<span class="hhmm">' + horas + ':' + minutos + '</span> <span class="ampm">' + ampm + '</span>';
         }
-        
-        // Animación suave para cambio de hora
-        if (horaElement.textContent.trim() !== textoPlano) {
-            horaElement.style.transform = 'scale(1.05)';
-            horaElement.style.color = '#ffeb3b';
-            setTimeout(() => {
-                horaElement.innerHTML = '<span class="hhmm">' + horas + ':' + minutos + '</span> <span class="ampm">' + ampm + '</span>';
-                horaElement.style.transform = 'scale(1)';
-                horaElement.style.color = '#fff';
-            }, 200);
-        }
-        
-        // Fecha
-        const dia = ahora.getDate().toString().padStart(2, '0');
-        const mes = (ahora.getMonth() + 1).toString().padStart(2, '0');
-        const anio = ahora.getFullYear();
-        const nuevaFecha = dia + '/' + mes + '/' + anio;
-        
-        // Actualizar fecha inmediatamente si está vacía
-        if (!fechaElement.textContent.trim()) {
+        if (cambiaFecha) {
             fechaElement.textContent = nuevaFecha;
         }
-        
-        if (fechaElement.textContent !== nuevaFecha) {
-            fechaElement.style.transform = 'scale(1.02)';
-            setTimeout(() => {
-                fechaElement.textContent = nuevaFecha;
-                fechaElement.style.transform = 'scale(1)';
-            }, 200);
-        }
-    } catch (error) {
-        console.error('Error en actualizarHoraFecha:', error);
-    }
+    };
 }
 
-// Función para actualizar el clima dinámicamente
+// Tarea del clima: consulta la API y encola la actualización del DOM
 async function actualizarClima() {
     try {
-        const response = await fetch('/api/clima');
+        const response = await fetchMedido('clima', '/api/clima');
         const clima = await parseJsonSafely(response);
         
         if (!clima) {
@@ -101,37 +513,21 @@ async function actualizarClima() {
             return;
         }
         
-        if (clima) {
+        encolarEscritura(() => {
             const iconoElement = document.getElementById('icono-clima');
             const temperaturaElement = document.getElementById('temperatura-actual');
             const descripcionElement = document.getElementById('descripcion-clima');
             
-            // Animación suave para cambio de clima
-            const weatherInfo = document.querySelector('.weather-info');
-            weatherInfo.style.opacity = '0.7';
-            weatherInfo.style.transform = 'scale(0.95)';
-            
-            setTimeout(() => {
-                // Actualizar icono
-                if (iconoElement) {
-                    iconoElement.className = `bi ${clima.icono_bootstrap} weather-icon`;
-                }
-                
-                // Actualizar temperatura
-                if (temperaturaElement) {
-                    temperaturaElement.textContent = `${Math.round(clima.temperatura_actual)}°C`;
-                }
-                
-                // Actualizar descripción
-                if (descripcionElement) {
-                    descripcionElement.textContent = clima.descripcion;
-                }
-                
-                // Restaurar animación
-                weatherInfo.style.opacity = '1';
-                weatherInfo.style.transform = 'scale(1)';
-            }, 300);
-        }
+            if (iconoElement) {
+                iconoElement.className = `bi ${clima.icono_bootstrap} weather-icon`;
+            }
+            if (temperaturaElement) {
+                temperaturaElement.textContent = `${Math.round(clima.temperatura_actual)}°C`;
+            }
+            if (descripcionElement) {
+                descripcionElement.textContent = clima.descripcion;
+            }
+        });
     } catch (error) {
         console.error('Error actualizando clima:', error);
     }
@@ -140,7 +536,7 @@ async function actualizarClima() {
 // Función para cargar avisos desde la API
 async function cargarAvisos() {
     try {
-        const response = await fetch('/panel/avisos');
+        const response = await fetchMedido('avisos', '/panel/avisos');
         
         if (!response.ok) {
             throw new Error(`Error HTTP: ${response.status} - ${response.statusText}`);
@@ -151,7 +547,7 @@ async function cargarAvisos() {
         if (!data) {
             console.warn('No se pudo obtener datos de avisos válidos');
             avisos = [];
-            mostrarMensajeFallback();
+            encolarEscritura(mostrarMensajeFallback);
             return;
         }
         
@@ -163,26 +559,35 @@ async function cargarAvisos() {
             avisos = data;
         }
         
-        // Limitar el set de rotación a los 4 que están en la vista (main + 3 laterales)
-        avisosEnPantalla = obtenerAvisosInicialesDesdeDOM(avisos);
+        // La rotación recorre todos los avisos publicados, no solo los 4
+        // que el servidor pintó en la vista inicial
+        avisosEnPantalla = avisos.slice();
         console.log('Avisos cargados:', avisos.length);
         
         // Reiniciar el índice de rotación para asegurar que comience con noticias de hoy
         mainCardRotationIndex = 0;
+        liberarImagenesFuera();
         
         if (avisosEnPantalla.length > 0) {
+            // Esperar (como mucho unos segundos) a tener decodificadas las
+            // primeras imágenes para que la primera transición no se corte
+            await Promise.race([
+                precargarSiguientes(),
+                new Promise(resolve => setTimeout(resolve, PRECARGA_INICIAL_MAX_MS))
+            ]);
             iniciarRotacionAvisos();
         } else {
             console.warn('No hay avisos disponibles para rotación');
             // Solo mostrar mensaje de fallback si realmente no hay ningún aviso
             if (avisos.length === 0) {
-                mostrarMensajeFallback();
+                encolarEscritura(mostrarMensajeFallback);
             }
         }
     } catch (error) {
         console.error('Error cargando avisos:', error);
+        registrarError(`Error cargando avisos: ${error}`);
         // Mostrar mensaje de error en la interfaz
-        mostrarErrorCarga();
+        encolarEscritura(mostrarErrorCarga);
     }
 }
 
@@ -284,170 +689,121 @@ function obtenerAvisosVentanaCircular(cantidadRequerida) {
     return result;
 }
 
-// Función para rotar avisos en las tarjetas
-function rotarAvisos() {
-    const sideCards = document.querySelectorAll('.side-card');
+// Rellena una tarjeta lateral (solo escrituras)
+function pintarTarjetaLateral(card, aviso, fecha, titulo, opacidad) {
+    card.style.opacity = opacidad;
+    ponerImagenTarjeta(card, urlImagenAviso(aviso));
     
-    if (avisos.length === 0 || sideCards.length === 0) {
-        // Si no hay avisos, asegurar que las tarjetas mantengan su tamaño
-        mantenerTarjetasLaterales();
-        return;
+    const overlay = card.querySelector('.side-card-overlay');
+    if (overlay) {
+        const dateElement = overlay.querySelector('.side-card-date');
+        const titleElement = overlay.querySelector('.side-card-title');
+        if (dateElement) dateElement.textContent = fecha;
+        if (titleElement) titleElement.textContent = titulo;
     }
-    
-    // Avisos para laterales basados en ventana circular a partir del índice del principal
-    const avisosUnicos = obtenerAvisosVentanaCircular(sideCards.length);
-    
+}
+
+function rangoFechasAviso(aviso) {
+    const fechaInicio = aviso.fecha_inicio ? new Date(aviso.fecha_inicio).toLocaleDateString('es-ES') : '';
+    const fechaFin = aviso.fecha_fin ? new Date(aviso.fecha_fin).toLocaleDateString('es-ES') : '';
+    return fechaInicio && fechaFin ? `${fechaInicio} - ${fechaFin}` : '';
+}
+
+// Función para rotar avisos en las tarjetas laterales
+function rotarAvisos(sideCards, avisosUnicos) {
     sideCards.forEach((card, index) => {
         const aviso = avisosUnicos[index];
         
         if (aviso) {
-            // Animación de salida
-            card.style.opacity = '0.7';
-            card.style.transform = 'scale(0.95)';
-            
-            setTimeout(() => {
-                // Actualizar contenido con animación de zoom
-                const imgUrl = aviso.image_url && aviso.image_url.trim() !== ''
-                    ? aviso.image_url
-                    : '/static/main_panel/img/logo.png';
-                card.classList.add('image-transition');
-                card.style.backgroundImage = `url('${imgUrl}')`;
-                
-                // Remover la clase después de la animación
-                setTimeout(() => {
-                    card.classList.remove('image-transition');
-                }, 800);
-                
-                const overlay = card.querySelector('.side-card-overlay');
-                if (overlay) {
-                    const dateElement = overlay.querySelector('.side-card-date');
-                    const titleElement = overlay.querySelector('.side-card-title');
-                    
-                    if (dateElement) {
-                        const fechaInicio = aviso.fecha_inicio ? new Date(aviso.fecha_inicio).toLocaleDateString('es-ES') : '';
-                        const fechaFin = aviso.fecha_fin ? new Date(aviso.fecha_fin).toLocaleDateString('es-ES') : '';
-                        dateElement.textContent = fechaInicio && fechaFin ? `${fechaInicio} - ${fechaFin}` : '';
-                    }
-                    
-                    if (titleElement) {
-                        titleElement.textContent = aviso.title || '';
-                    }
-                }
-                
-                // Animación de entrada
-                card.style.opacity = '1';
-                card.style.transform = 'scale(1)';
-            }, 300);
-        } else {
+            pintarTarjetaLateral(card, aviso, rangoFechasAviso(aviso), aviso.title || '', '1');
+        } else if (avisos.length > 0) {
             // Si no hay aviso específico pero hay noticias disponibles, usar la primera disponible
-            if (avisos.length > 0) {
-                const avisoDisponible = avisos[0];
-                card.style.opacity = '0.8';
-                const imgUrl = avisoDisponible.image_url && avisoDisponible.image_url.trim() !== ''
-                    ? avisoDisponible.image_url
-                    : '/static/main_panel/img/logo.png';
-                card.style.backgroundImage = `url('${imgUrl}')`;
-                
-                const overlay = card.querySelector('.side-card-overlay');
-                if (overlay) {
-                    const dateElement = overlay.querySelector('.side-card-date');
-                    const titleElement = overlay.querySelector('.side-card-title');
-                    
-                    if (dateElement) {
-                        const fechaInicio = avisoDisponible.fecha_inicio ? new Date(avisoDisponible.fecha_inicio).toLocaleDateString('es-ES') : '';
-                        const fechaFin = avisoDisponible.fecha_fin ? new Date(avisoDisponible.fecha_fin).toLocaleDateString('es-ES') : '';
-                        dateElement.textContent = fechaInicio && fechaFin ? `${fechaInicio} - ${fechaFin}` : '';
-                    }
-                    
-                    if (titleElement) {
-                        titleElement.textContent = avisoDisponible.title || '';
-                    }
-                }
-            } else {
-                // Solo mostrar placeholder si realmente no hay noticias
-                card.style.opacity = '0.6';
-                card.style.backgroundImage = 'url(\'/static/main_panel/img/logo.png\')';
-                
-                const overlay = card.querySelector('.side-card-overlay');
-                if (overlay) {
-                    const dateElement = overlay.querySelector('.side-card-date');
-                    const titleElement = overlay.querySelector('.side-card-title');
-                    
-                    if (dateElement) {
-                        dateElement.textContent = 'Próximamente';
-                    }
-                    if (titleElement) {
-                        titleElement.textContent = 'Nueva noticia';
-                    }
-                }
-            }
+            const avisoDisponible = avisos[0];
+            pintarTarjetaLateral(card, avisoDisponible, rangoFechasAviso(avisoDisponible), avisoDisponible.title || '', '0.8');
+        } else {
+            // Solo mostrar placeholder si realmente no hay noticias
+            pintarTarjetaLateral(card, null, 'Próximamente', 'Nueva noticia', '0.6');
         }
     });
+}
+
+// Función para rotar el aviso principal (solo escrituras)
+function rotarAvisoPrincipalSincronizado(mainCard, mainCardText, avisoParaPrincipal) {
+    if (!mainCard || !avisoParaPrincipal) return;
+    
+    // Actualizar el ID del aviso principal actual
+    currentMainCardId = avisoParaPrincipal.id;
+    ponerImagenTarjeta(mainCard, urlImagenAviso(avisoParaPrincipal));
+    
+    if (mainCardText) {
+        mainCardText.innerHTML = avisoParaPrincipal.title || 'Se acerca el 18, con ello<br>actividades recreativas<br>¡Pasalo chancho!';
+        mainCardText.dataset.avisoId = avisoParaPrincipal.id || '';
+    }
+    // Actualizar badge de fecha dinámicamente
+    actualizarBadgeFechaPrincipal(avisoParaPrincipal);
+}
+
+// Animaciones de entrada de cada rotación: rebote del texto (escalonado en
+// las laterales con animation-delay, sin temporizadores)
+function animarRotacion(mainCard, sideCards) {
+    const textos = [];
+    if (mainCard) {
+        const mainText = mainCard.querySelector('.main-card-text');
+        const badge = mainCard.querySelector('.main-card-badge');
+        if (mainText) textos.push(mainText);
+        if (badge) textos.push(badge);
+    }
+    reiniciarAnimacion(textos, 'bounce-in');
     
-    // Nota: El índice se avanza ahora en rotarTodosLosAvisos()
+    const overlays = sideCards.map(card => card.querySelector('.side-card-overlay')).filter(Boolean);
+    overlays.forEach((el, i) => { el.style.animationDelay = `${i * 120}ms`; });
+    reiniciarAnimacion(overlays, 'bounce-in-small');
+}
+
+// Zoom lento de fondo para mantener viva la pantalla. Son animaciones CSS
+// infinitas: basta con aplicarlas una vez a cada tarjeta.
+function aplicarAnimacionReposo() {
+    const offsets = [-0.06, -0.12, -0.18, -0.24];
+    const main = document.querySelector('.main-card');
+    if (main && !main.classList.contains('kb-main-zoom-in')) {
+        main.classList.add('kb-main-zoom-in');
+        main.style.setProperty('--kb-offset', '-0.15s');
+    }
+    document.querySelectorAll('.side-card').forEach((el, i) => {
+        if (el.classList.contains('kb-side-zoom-in')) return;
+        el.classList.add('kb-side-zoom-in');
+        el.style.setProperty('--kb-offset', offsets[i % offsets.length] + 's');
+    });
 }
 
-// Función para rotar tanto el aviso principal como las tarjetas laterales
+// Tarea de rotación: avanza el índice, lee las tarjetas y devuelve la
+// escritura del aviso principal y las laterales en un mismo cuadro
 function rotarTodosLosAvisos() {
     const fuente = avisosEnPantalla.length ? avisosEnPantalla : avisos;
-    if (fuente.length === 0) return;
+    const sideCards = Array.from(document.querySelectorAll('.side-card'));
+    
+    if (fuente.length === 0) {
+        // Si no hay avisos, asegurar que las tarjetas mantengan su tamaño
+        return mantenerTarjetasLaterales;
+    }
     
     // Primero avanzar el índice del aviso principal
     mainCardRotationIndex = (mainCardRotationIndex + 1) % fuente.length;
+    currentAvisoIndex = (currentAvisoIndex + 1) % Math.max(fuente.length, 1);
     
-    // Luego rotar el aviso principal
-    rotarAvisoPrincipalSincronizado();
-    
-    // Después rotar las tarjetas laterales con un pequeño delay
-    setTimeout(() => {
-        rotarAvisos();
-        // currentAvisoIndex ya no es necesario para la ventana circular, pero lo mantenemos si en el futuro se usa
-        currentAvisoIndex = (currentAvisoIndex + 1) % Math.max((avisosEnPantalla.length ? avisosEnPantalla.length : avisos.length), 1);
-    }, 200);
-}
-
-// Función para rotar el aviso principal de forma sincronizada
-function rotarAvisoPrincipalSincronizado() {
     const mainCard = document.querySelector('.main-card');
     const mainCardText = document.querySelector('.main-card-text');
-    
-    if (avisos.length === 0 || !mainCard) return;
-    
-    // Obtener el aviso actual para el recuadro principal (el índice ya fue avanzado)
     const avisoParaPrincipal = obtenerSiguienteAvisoParaPrincipal();
+    // Avisos para laterales basados en ventana circular a partir del índice del principal
+    const avisosUnicos = obtenerAvisosVentanaCircular(sideCards.length);
     
-    if (avisoParaPrincipal) {
-        // Actualizar el ID del aviso principal actual
-        currentMainCardId = avisoParaPrincipal.id;
-        
-        // Animación de transición
-        mainCard.style.opacity = '0.8';
-        mainCard.style.transform = 'scale(0.98)';
-        
-        setTimeout(() => {
-            const imgUrl = avisoParaPrincipal.image_url && avisoParaPrincipal.image_url.trim() !== ''
-                ? avisoParaPrincipal.image_url
-                : '/static/main_panel/img/logo.png';
-            mainCard.classList.add('image-transition');
-            mainCard.style.backgroundImage = `url('${imgUrl}')`;
-            
-            // Remover la clase después de la animación
-            setTimeout(() => {
-                mainCard.classList.remove('image-transition');
-            }, 800);
-            
-            if (mainCardText) {
-                mainCardText.innerHTML = avisoParaPrincipal.title || 'Se acerca el 18, con ello<br>actividades recreativas<br>¡Pasalo chancho!';
-                mainCardText.dataset.avisoId = avisoParaPrincipal.id || '';
-            }
-            // Actualizar badge de fecha dinámicamente
-            actualizarBadgeFechaPrincipal(avisoParaPrincipal);
-            
-            // Restaurar animación
-            mainCard.style.opacity = '1';
-            mainCard.style.transform = 'scale(1)';
-        }, 400);
-    }
+    return () => {
+        rotarAvisoPrincipalSincronizado(mainCard, mainCardText, avisoParaPrincipal);
+        rotarAvisos(sideCards, avisosUnicos);
+        animarRotacion(mainCard, sideCards);
+        // Preparar las imágenes de las próximas rotaciones
+        precargarSiguientes();
+    };
 }
 
 function humanizeFecha(fechaIso) {
@@ -525,14 +881,11 @@ function obtenerSiguienteAvisoParaPrincipal() {
 
 // Función para iniciar la rotación de avisos
 function iniciarRotacionAvisos() {
-    // Rotar inmediatamente
-    rotarTodosLosAvisos();
-    
-    // Configurar rotación automática cada 8 segundos
-    if (rotationInterval) {
-        clearInterval(rotationInterval);
+    // Rotar inmediatamente y después cada INTERVALO_ROTACION
+    if (tareaRotacion) {
+        cancelarTarea(tareaRotacion);
     }
-    rotationInterval = setInterval(rotarTodosLosAvisos, 8000);
+    tareaRotacion = programarTarea('rotacion', INTERVALO_ROTACION, rotarTodosLosAvisos, { inmediata: true });
 }
 
 // Función para mostrar notificación de actualización
@@ -611,75 +964,165 @@ function mostrarNotificacionActualizacion() {
     }, 3000);
 }
 
+// Tarea de comprobación de cambios en la base de datos
+async function verificarCambios() {
+    try {
+        const response = await fetchMedido('avisos_hash', '/panel/avisos_hash');
+        if (!response.ok) {
+            console.warn('Error al verificar cambios:', response.status);
+            return;
+        }
+        
+        const data = await parseJsonSafely(response);
+        if (!data) {
+            console.warn('No se pudo obtener hash válido');
+            return;
+        }
+        
+        if (data && data.hash) {
+            if (!ultimoHashAvisos) {
+                // Primera vez, solo guardar el hash
+                ultimoHashAvisos = data.hash;
+                console.log('Hash inicial establecido:', data.hash);
+            } else if (ultimoHashAvisos !== data.hash) {
+                // Hash cambió, mostrar notificación y recargar la página
+                console.log('Cambios detectados en la base de datos. Recargando...');
+                console.log('Hash anterior:', ultimoHashAvisos);
+                console.log('Hash nuevo:', data.hash);
+                
+                // Mostrar notificación visual de actualización
+                mostrarNotificacionActualizacion();
+                
+                // Recargar después de un breve delay para que se vea la notificación
+                setTimeout(() => {
+                    location.reload();
+                }, 1000);
+            }
+        }
+    } catch (error) {
+        console.warn('Error verificando cambios:', error);
+        // No recargar en caso de error de red, solo loguear
+    }
+}
+
 // Función para iniciar el sistema de polling de cambios
 function iniciarPollingCambios() {
-    // Limpiar intervalos existentes
-    if (hashPollInterval) {
-        clearInterval(hashPollInterval);
-    }
+    // Verificar cambios inmediatamente y después cada minuto. Al volver a
+    // mostrarse la página el planificador ejecuta la comprobación si venció.
+    programarTarea('avisos_hash', INTERVALO_HASH, verificarCambios, { inmediata: true });
     
-    // Función para verificar cambios en la base de datos
-    const verificarCambios = async () => {
-        try {
-            const response = await fetch('/panel/avisos_hash');
-            if (!response.ok) {
-                console.warn('Error al verificar cambios:', response.status);
-                return;
-            }
-            
-            const data = await parseJsonSafely(response);
-            if (!data) {
-                console.warn('No se pudo obtener hash válido');
-                return;
-            }
-            
-            if (data && data.hash) {
-                if (!ultimoHashAvisos) {
-                    // Primera vez, solo guardar el hash
-                    ultimoHashAvisos = data.hash;
-                    console.log('Hash inicial establecido:', data.hash);
-                } else if (ultimoHashAvisos !== data.hash) {
-                    // Hash cambió, mostrar notificación y recargar la página
-                    console.log('Cambios detectados en la base de datos. Recargando...');
-                    console.log('Hash anterior:', ultimoHashAvisos);
-                    console.log('Hash nuevo:', data.hash);
-                    
-                    // Mostrar notificación visual de actualización
-                    mostrarNotificacionActualizacion();
-                    
-                    // Recargar después de un breve delay para que se vea la notificación
-                    setTimeout(() => {
-                        location.reload();
-                    }, 1000);
-                }
-            }
-        } catch (error) {
-            console.warn('Error verificando cambios:', error);
-            // No recargar en caso de error de red, solo loguear
+    // Verificar cambios cuando la ventana recupera el foco
+    window.addEventListener('focus', () => {
+        console.log('Ventana con foco, verificando cambios...');
+        verificarCambios();
+    });
+}
+
+
+// Descarga una imagen a la caché HTTP del navegador, sin decodificarla,
+// cuando la pantalla esté desocupada
+function descargarEnReposo(url) {
+    if (imagenesDescargadas.has(url)) return;
+    // Sin CORS la imagen se descarga con un <img> (también queda en la caché HTTP)
+    const descargarConImg = () => {
+        const img = new Image();
+        img.onload = () => imagenesDescargadas.add(url);
+        img.onerror = () => console.warn('No se pudo descargar la imagen programada', url);
+        img.src = url;
+    };
+    const descargar = () => {
+        if (imagenesSinFetch.has(url)) {
+            descargarConImg();
+            return;
         }
+        fetch(url)
+            .then(response => {
+                if (!response.ok) throw new Error(`Error HTTP: ${response.status}`);
+                return response.blob();
+            })
+            .then(() => imagenesDescargadas.add(url), () => {
+                imagenesSinFetch.add(url);
+                descargarConImg();
+            });
     };
+    if (typeof requestIdleCallback === 'function') {
+        requestIdleCallback(descargar, { timeout: 10000 });
+    } else {
+        descargar();
+    }
+}
+
+// Tarea de publicación: incorpora el aviso a la rotación y lo deja como el
+// siguiente de la tarjeta principal, que se pinta en el próximo cuadro
+function publicarAvisoProgramado(aviso) {
+    const id = String(aviso.id);
+    if (!avisos.some(a => String(a.id) === id)) avisos = [...avisos, aviso];
+    if (avisosEnPantalla.some(a => String(a.id) === id)) return;
     
-    // Verificar cambios inmediatamente
-    verificarCambios();
-    
-    // Configurar verificación cada 10 segundos para detectar cambios continuamente
-    hashPollInterval = setInterval(verificarCambios, 60000);//
+    const base = avisosEnPantalla.length ? avisosEnPantalla : avisos.filter(a => String(a.id) !== id);
+    avisosEnPantalla = [aviso, ...base];
+    console.log('Aviso programado publicado:', id);
     
-    // Verificar cambios cuando la pestaña vuelve a estar activa
-    document.addEventListener('visibilitychange', () => {
-        if (!document.hidden) {
-            console.log('Pestaña activa, verificando cambios...');
-            verificarCambios();
-        }
+    // La rotación avanza el índice antes de pintar: se deja justo antes del nuevo
+    const posicion = priorizarAvisosDeHoy(avisosEnPantalla).indexOf(aviso);
+    mainCardRotationIndex = (posicion - 1 + avisosEnPantalla.length) % avisosEnPantalla.length;
+    iniciarRotacionAvisos();
+}
+
+// Programa la descarga, la decodificación y la publicación de cada aviso
+// programado. Las horas se calculan con el reloj de la pantalla, igual que
+// las etiquetas de fecha; si la hora ya pasó se publica en el momento.
+function programarAvisos(programados) {
+    const ahora = Date.now();
+    // Una publicación que ya venció no se cancela aunque el aviso haya
+    // salido de la lista: se hace ahora
+    publicacionesPendientes.forEach(({ aviso, hora }) => {
+        if (hora <= ahora) publicarAvisoProgramado(aviso);
     });
+    publicacionesPendientes.clear();
+    tareasProgramados.forEach(cancelarTarea);
+    tareasProgramados = [];
     
-    // Verificar cambios cuando la ventana recupera el foco
-    window.addEventListener('focus', () => {
-        console.log('Ventana con foco, verificando cambios...');
-        verificarCambios();
+    programados.forEach(aviso => {
+        const publicaEn = new Date(aviso.fecha_inicio).getTime() - ahora;
+        if (Number.isNaN(publicaEn)) return;
+        const url = urlImagenAviso(aviso);
+        const hastaDecodificar = Math.max(0, publicaEn - ANTELACION_DECODIFICAR_MS);
+        
+        if (hastaDecodificar > 0) {
+            const retardo = Math.random() * Math.min(DISPERSION_DESCARGA_MS, hastaDecodificar);
+            tareasProgramados.push(programarTarea(`descarga_${aviso.id}`, 0, () => descargarEnReposo(url), { retardo, unaVez: true }));
+        }
+        tareasProgramados.push(programarTarea(`decodificar_${aviso.id}`, 0, () => { precargarImagen(url); }, { retardo: hastaDecodificar, unaVez: true }));
+        publicacionesPendientes.set(String(aviso.id), { aviso, hora: ahora + publicaEn });
+        tareasProgramados.push(programarTarea(`publicar_${aviso.id}`, 0, () => {
+            publicacionesPendientes.delete(String(aviso.id));
+            publicarAvisoProgramado(aviso);
+        }, { retardo: Math.max(0, publicaEn), unaVez: true }));
     });
 }
 
+// Tarea de consulta de los avisos programados
+async function cargarAvisosProgramados() {
+    try {
+        const response = await fetchMedido('avisos_programados', '/panel/avisos_programados');
+        if (!response.ok) {
+            console.warn('Error al consultar avisos programados:', response.status);
+            return;
+        }
+        
+        const data = await parseJsonSafely(response);
+        if (!data || !Array.isArray(data.avisos)) {
+            console.warn('No se pudo obtener avisos programados válidos');
+            return;
+        }
+        
+        programarAvisos(data.avisos);
+    } catch (error) {
+        console.warn('Error consultando avisos programados:', error);
+    }
+}
+
 
 // Función para obtener el aviso más próximo por fecha
 function obtenerAvisoMasProximo() {
@@ -709,75 +1152,41 @@ function obtenerIdAvisoPrincipalInicial() {
     if (mainCardText && mainCardText.dataset && mainCardText.dataset.avisoId) {
         currentMainCardId = parseInt(mainCardText.dataset.avisoId);
     }
-
-    // Construir lista inicial a partir del DOM: principal + laterales
-    const sideCards = Array.from(document.querySelectorAll('.side-card'));
-    const idsSide = sideCards
-        .map(c => parseInt(c.getAttribute('data-aviso-id'))) 
-        .filter(v => !Number.isNaN(v));
-    const ids = [];
-    if (!Number.isNaN(currentMainCardId)) ids.push(currentMainCardId);
-    ids.push(...idsSide);
-    // Mapear a objetos de avisos ya cargados cuando llegue la API
-    window.__idsInicialesAvisos = ids;
-}
-
-function obtenerAvisosInicialesDesdeDOM(listaAvisosApi) {
-    if (!window.__idsInicialesAvisos || !Array.isArray(window.__idsInicialesAvisos)) {
-        // Si no hay IDs iniciales, priorizar noticias de hoy y tomar las primeras 4
-        const avisosPriorizados = priorizarAvisosDeHoy(listaAvisosApi);
-        return avisosPriorizados.slice(0, 4);
-    }
-    
-    const byId = new Map(listaAvisosApi.map(a => [a.id, a]));
-    const result = [];
-    window.__idsInicialesAvisos.forEach(id => {
-        const a = byId.get(id);
-        if (a) result.push(a);
-    });
-    
-    // Priorizar noticias de hoy en el resultado final
-    const avisosPriorizados = priorizarAvisosDeHoy(result);
-    
-    // Asegurar máximo 4
-    return avisosPriorizados.slice(0, 4);
 }
 
 // Inicialización
 document.addEventListener('DOMContentLoaded', function() {
-    console.log('DOM cargado, iniciando actualización de fecha y hora...');
+    console.log('DOM cargado, iniciando planificador de la pantalla...');
     
-    // Actualizar fecha y hora inmediatamente
-    actualizarHoraFecha();
+    // Fecha y hora ya, y después en cada cambio de minuto
+    programarTarea('reloj', 60000, actualizarHoraFecha, { inmediata: true, alinear: true });
     
-    // Configurar actualización cada segundo
-    setInterval(actualizarHoraFecha, 1000);
-    
-    // Actualizar clima inmediatamente y luego cada 10 minutos
-    actualizarClima();
-    setInterval(actualizarClima, 600000); // 10 minutos = 600,000 ms
+    // Clima ya y luego cada 10 minutos
+    programarTarea('clima', INTERVALO_CLIMA, actualizarClima, { inmediata: true });
     
     // Obtener el ID del aviso principal inicial
     obtenerIdAvisoPrincipalInicial();
     
+    // Zoom de reposo de las tarjetas renderizadas por el servidor
+    encolarEscritura(aplicarAnimacionReposo);
+    
     // Iniciar el sistema de polling de cambios inmediatamente
     iniciarPollingCambios();
     
-    // Cargar avisos después de un breve delay para permitir que la página cargue
-    setTimeout(() => {
-        cargarAvisos();
-        // Nota: La rotación del aviso principal ahora está integrada con las tarjetas laterales
-        // en la función iniciarRotacionAvisos(), no necesita intervalo separado
-    }, 2000);
-});
-
-// También actualizar cuando la ventana se carga completamente
-window.addEventListener('load', function() {
-    console.log('Ventana cargada completamente, actualizando fecha y hora...');
-    actualizarHoraFecha();
+    // Cargar avisos después de un breve delay para permitir que la página
+    // cargue; cargarAvisos() inicia la rotación
+    programarTarea('carga_avisos', 0, cargarAvisos, { retardo: RETARDO_CARGA_AVISOS, unaVez: true });
+    
+    // Avisos programados: después de la carga inicial y luego cada 5 minutos
+    programarTarea('avisos_programados', INTERVALO_PROGRAMADOS, cargarAvisosProgramados, { retardo: RETARDO_CARGA_AVISOS });
+    
+    // Lote de telemetría cada minuto
+    if (TELEMETRIA_ACTIVA) {
+        programarTarea('telemetria', INTERVALO_TELEMETRIA, () => enviarTelemetria());
+    }
 });
 
-// Función de prueba para verificar elementos
+// Función de prueba para verificar elementos (ejecutar desde la consola)
 function verificarElementos() {
     console.log('=== VERIFICACIÓN DE ELEMENTOS ===');
     const horaElement = document.getElementById('hora-actual');
@@ -796,10 +1205,8 @@ function verificarElementos() {
     }
     
     // Forzar actualización
-    actualizarHoraFecha();
+    const escribir = actualizarHoraFecha();
+    if (escribir) encolarEscritura(escribir);
     
     console.log('=== FIN VERIFICACIÓN ===');
 }
-
-// Ejecutar verificación después de 3 segundos
-setTimeout(verificarElementos, 3000);
@@ -0,0 +1,197 @@
+"""
+Exportación estática de la pantalla pública.
+
+Con EXPORT_DIR configurado, la página de las pantallas, el JSON de avisos
+(publicados y programados), su hash, el clima y los ficheros estáticos e
+imágenes que usan se generan en un directorio versionado:
+
+    EXPORT_DIR/releases/<fecha>-<hash>/index.html
+                                       panel/avisos
+                                       panel/avisos_programados
+                                       panel/avisos_hash
+                                       api/clima
+                                       static/main_panel/...
+                                       static/uploads/...
+    EXPORT_DIR/current -> releases/<fecha>-<hash>
+
+El enlace `current` se cambia de forma atómica (symlink temporal +
+os.replace), así que un servidor estático nunca ve una versión a medias.
+Ejemplo con nginx (las rutas JSON no tienen extensión):
+
+    root /srv/panel/current;
+    location /panel/ { default_type application/json; }
+    location /api/   { default_type application/json; }
+
+Todo lo que consulta la pantalla (avisos, avisos programados, hash y clima)
+está en la exportación, salvo POST /panel/telemetry. Por defecto la página
+exportada no envía telemetría; con EXPORT_TELEMETRY=1 sí la envía, y
+entonces nginx debe pasar esa ruta a la aplicación:
+
+    location = /panel/telemetry { proxy_pass http://127.0.0.1:5000; }
+
+Se regenera tras cada escritura del panel (después de reconstruir la caché
+y de procesar imágenes), a la hora de publicación de cada aviso programado
+y cada EXPORT_INTERVAL_SECONDS; al pedir /api/clima
+para exportarlo se refresca el clima si la copia compartida caducó. Si el
+contenido no cambió no se crea versión nueva. Se conservan las EXPORT_KEEP
+versiones más recientes. También puede lanzarse a mano con
+`flask --app server export-static`.
+"""
+from datetime import datetime
+import hashlib
+import os
+import shutil
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+from flask import current_app
+
+from flask_app.jobs import job_queue
+
+# Rutas públicas que consumen las pantallas -> fichero dentro de la versión
+EXPORT_PAGES = [
+    ('/', 'index.html'),
+    ('/panel/avisos', 'panel/avisos'),
+    ('/panel/avisos_programados', 'panel/avisos_programados'),
+    ('/panel/avisos_hash', 'panel/avisos_hash'),
+    ('/api/clima', 'api/clima'),
+]
+# Marca en el entorno WSGI de las peticiones de la exportación
+STATIC_EXPORT_ENVIRON = 'panel_informativo.static_export'
+# Directorios estáticos que se copian completos (el resto, solo si se usan)
+EXPORT_STATIC_DIRS = ['main_panel']
+
+
+def _link_or_copy(src, dst):
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _render_pages(app):
+    """Pide cada ruta pública a la propia aplicación; None si alguna falla."""
+    pages = {}
+    client = app.test_client()
+    for url, name in EXPORT_PAGES:
+        response = client.get(url, environ_base={STATIC_EXPORT_ENVIRON: True})
+        if response.status_code != 200:
+            app.logger.warning('Exportación estática cancelada: %s devolvió %s', url, response.status_code)
+            return None
+        pages[name] = response.get_data()
+    return pages
+
+
+def _static_files(app, pages):
+    """Ficheros de /static que necesita la página: main_panel y las imágenes de los avisos."""
+    files = {}
+    static_folder = app.static_folder
+    for directory in EXPORT_STATIC_DIRS:
+        base = os.path.join(static_folder, directory)
+        for root, _, names in os.walk(base):
+            for name in names:
+                path = os.path.join(root, name)
+                files[os.path.relpath(path, static_folder)] = path
+
+    avisos = app.json.loads(pages['panel/avisos'])
+    avisos += app.json.loads(pages['panel/avisos_programados'])['avisos']
+    for aviso in avisos:
+        url = aviso.get('image_url') or ''
+        if url.startswith('/static/'):
+            rel = os.path.normpath(url[len('/static/'):])
+            path = os.path.join(static_folder, rel)
+            if not rel.startswith('..') and os.path.isfile(path):
+                files[rel] = path
+    return files
+
+
+def _fingerprint(pages, files):
+    digest = hashlib.sha256()
+    for name in sorted(pages):
+        digest.update(name.encode() + b'\0' + pages[name] + b'\0')
+    for rel in sorted(files):
+        stat = os.stat(files[rel])
+        digest.update(f'{rel}\0{stat.st_size}\0{stat.st_mtime_ns}\0'.encode())
+    return digest.hexdigest()[:12]
+
+
+def _prune(releases_dir, keep, current_name):
+    names = sorted(n for n in os.listdir(releases_dir) if not n.startswith('.'))
+    for name in names[:-keep] if keep > 0 else []:
+        if name != current_name:
+            shutil.rmtree(os.path.join(releases_dir, name), ignore_errors=True)
+
+
+def export_site(app=None):
+    """Genera una versión nueva si el contenido cambió; devuelve su nombre o None."""
+    app = app or current_app._get_current_object()
+    export_dir = app.config.get('EXPORT_DIR')
+    if not export_dir:
+        return None
+    releases_dir = os.path.join(export_dir, 'releases')
+    current_link = os.path.join(export_dir, 'current')
+    os.makedirs(releases_dir, exist_ok=True)
+
+    with open(os.path.join(export_dir, '.lock'), 'a+b') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        pages = _render_pages(app)
+        if pages is None:
+            return None
+        files = _static_files(app, pages)
+        fingerprint = _fingerprint(pages, files)
+
+        current_name = os.path.basename(os.path.realpath(current_link)) if os.path.islink(current_link) else None
+        if current_name and current_name.endswith('-' + fingerprint):
+            return None
+
+        name = f"{datetime.now():%Y%m%d-%H%M%S}-{fingerprint}"
+        tmp_dir = tempfile.mkdtemp(prefix='.tmp-', dir=releases_dir)
+        try:
+            for page, body in pages.items():
+                path = os.path.join(tmp_dir, page)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'wb') as f:
+                    f.write(body)
+            for rel, src in files.items():
+                _link_or_copy(src, os.path.join(tmp_dir, 'static', rel))
+            os.chmod(tmp_dir, 0o755)
+            os.rename(tmp_dir, os.path.join(releases_dir, name))
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        tmp_link = current_link + '.tmp'
+        if os.path.lexists(tmp_link):
+            os.remove(tmp_link)
+        os.symlink(os.path.join('releases', name), tmp_link)
+        os.replace(tmp_link, current_link)
+
+        _prune(releases_dir, app.config.get('EXPORT_KEEP', 5), name)
+    app.logger.info('Exportación estática publicada: %s', name)
+    return name
+
+
+def init_static_export(app):
+    """Registra el comando `flask export-static` y la regeneración periódica."""
+    app.config.setdefault('EXPORT_DIR', '')
+    app.config.setdefault('EXPORT_INTERVAL_SECONDS', 600)
+    app.config.setdefault('EXPORT_KEEP', 5)
+
+    @app.cli.command('export-static')
+    def export_static_command():
+        """Genera la exportación estática de la pantalla en EXPORT_DIR."""
+        if not app.config['EXPORT_DIR']:
+            print('EXPORT_DIR no está configurado')
+            return
+        name = export_site(app)
+        print(f'Versión publicada: {name}' if name else 'Sin cambios: no se generó versión nueva')
+
+    if app.config['EXPORT_DIR']:
+        job_queue.schedule('export_static', app.config['EXPORT_INTERVAL_SECONDS'], delay=5)
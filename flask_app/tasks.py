@@ -0,0 +1,152 @@
+"""
+Tareas en segundo plano que encolan las rutas de escritura del panel.
+
+- delete_file: borra una imagen de static/uploads.
+- render_image: reduce una imagen subida a IMAGE_MAX_WIDTH px de ancho
+  (requiere Pillow; sin Pillow la imagen se deja como está).
+- rebuild_cache: relee los avisos del primario, los publica en la caché
+  compartida y en la copia en disco, y deja serializada la respuesta de
+  /panel/avisos (solo los avisos ya publicados).
+- notify_change: registra el cambio para quien siga el log.
+- export_static: regenera la exportación estática de la pantalla (solo con
+  EXPORT_DIR); la encolan rebuild_cache y render_image al terminar, y ella
+  misma se vuelve a encolar para la hora de publicación del próximo aviso
+  programado.
+- archive_notices: mueve a notice_archive los avisos que terminaron hace
+  más de ARCHIVE_AFTER_DAYS días (tarea periódica).
+- flush_telemetry: vuelca al SQLite de telemetría los lotes de las
+  pantallas acumulados en memoria (tarea periódica).
+
+Los ficheros se identifican por nombre dentro de la carpeta de uploads,
+nunca por ruta absoluta, porque el payload se guarda en el diario.
+"""
+from datetime import datetime
+import os
+import tempfile
+import threading
+
+from flask import current_app
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow es opcional
+    Image = None
+
+from flask_app.controllers.panel_controller import (
+    PUBLISH_HORIZON_SECONDS,
+    cached_notices,
+    live_notices,
+    ordenar_por_proximidad,
+    publish_notices,
+    upcoming_notices,
+)
+from flask_app.jobs import job_queue
+from flask_app.json_provider import body_cache
+from flask_app.repositories import notice_repository
+from flask_app.static_export import export_site
+from flask_app.telemetry import telemetry_store
+
+
+def _upload_path(filename):
+    return os.path.join(current_app.static_folder, 'uploads', os.path.basename(filename))
+
+
+@job_queue.handler('delete_file')
+def delete_file(filename):
+    path = _upload_path(filename)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+@job_queue.handler('render_image')
+def render_image(filename):
+    if Image is None:
+        return
+    path = _upload_path(filename)
+    max_width = current_app.config.get('IMAGE_MAX_WIDTH', 1920)
+    with Image.open(path) as img:
+        if getattr(img, 'is_animated', False) or img.width <= max_width:
+            return
+        fmt = img.format
+        rendition = ImageOps.exif_transpose(img)
+        rendition.thumbnail((max_width, max_width * 4))
+        if fmt == 'JPEG' and rendition.mode not in ('RGB', 'L'):
+            rendition = rendition.convert('RGB')
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                rendition.save(f, format=fmt, optimize=True)
+            os.replace(tmp, path)
+        except Exception:
+            os.remove(tmp)
+            raise
+    _enqueue_export()
+
+
+@job_queue.handler('rebuild_cache')
+def rebuild_cache():
+    notices = notice_repository.list_notices()
+    publish_notices(notices)
+    live = live_notices(notices, datetime.now())
+    now = datetime.now().replace(second=0, microsecond=0)
+    body_cache.invalidate('avisos')
+    body_cache.invalidate('avisos_todos')
+    body_cache.get_or_build(
+        'avisos', (now, tuple(n.astuple() for n in live)),
+        lambda: current_app.json.dump_bytes(ordenar_por_proximidad(live, now))
+    )
+    _enqueue_export()
+
+
+def _enqueue_export():
+    if current_app.config.get('EXPORT_DIR'):
+        job_queue.enqueue('export_static')
+
+
+# Exportación pendiente para la publicación del próximo aviso programado
+_go_live_timer = None
+_go_live_lock = threading.Lock()
+
+
+@job_queue.handler('export_static')
+def export_static():
+    export_site()
+    _export_at_next_go_live()
+
+
+def _export_at_next_go_live():
+    """Programa una exportación para cuando se publique el próximo aviso."""
+    global _go_live_timer
+    now = datetime.now()
+    upcoming = upcoming_notices(cached_notices(), now, PUBLISH_HORIZON_SECONDS)
+    with _go_live_lock:
+        if _go_live_timer is not None:
+            _go_live_timer.cancel()
+            _go_live_timer = None
+        if upcoming:
+            delay = (upcoming[0].start_date - now).total_seconds() + 1
+            _go_live_timer = job_queue.enqueue_in(delay, 'export_static')
+
+
+@job_queue.handler('notify_change')
+def notify_change(action, notice_id):
+    current_app.logger.info('Aviso %s: %s', notice_id, action)
+
+
+@job_queue.handler('archive_notices')
+def archive_notices():
+    days = current_app.config['ARCHIVE_AFTER_DAYS']
+    archived = notice_repository.archive_expired(days)
+    if not archived:
+        return
+    current_app.logger.info('Archivados %s avisos terminados hace más de %s días', len(archived), days)
+    rebuild_cache()
+    for notice in archived:
+        notify_change('archived', notice.id)
+
+
+@job_queue.handler('flush_telemetry')
+def flush_telemetry():
+    dropped = telemetry_store.flush(current_app.config['TELEMETRY_RETENTION_DAYS'])
+    if dropped:
+        current_app.logger.warning('Telemetría descartada por los límites en el último periodo: %s', dropped)
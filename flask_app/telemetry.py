@@ -0,0 +1,325 @@
+"""
+Telemetría de las pantallas.
+
+Cada pantalla acumula sus métricas (duración de los cuadros, descarga y
+decodificación de imágenes, latencia de las peticiones, memoria, tiempo
+encendida y errores) y cada minuto envía un lote compacto a POST
+/panel/telemetry:
+
+    {"pantalla": "a1b2c3", "uptime": 3600.5, "memoria": 41943040,
+     "metricas": {"cuadro_ms": [n, suma, max], "fetch_avisos_ms": [...]},
+     "errores": ["Error cargando avisos: ..."]}
+
+El servidor no escribe nada por evento: suma los lotes en memoria por
+pantalla y métrica, y la tarea periódica 'flush_telemetry' los vuelca en
+bloque (executemany) a un SQLite local (TELEMETRY_DB_PATH) cada
+TELEMETRY_FLUSH_SECONDS, borrando lo anterior a TELEMETRY_RETENTION_DAYS.
+Lo acumulado y aún no volcado se pierde si el proceso termina.
+
+El endpoint es público, así que lo acumulado en memoria está acotado por
+periodo de volcado: como mucho TELEMETRY_MAX_SCREENS pantallas distintas,
+TELEMETRY_MAX_KEYS pares (pantalla, métrica) y TELEMETRY_MAX_ERRORS
+errores; lo que no cabe se descarta y se cuenta, y el volcado lo deja en el
+log. Cada pantalla puede enviar TELEMETRY_BATCHES_PER_SCREEN lotes por
+periodo (el periódico más los de pagehide y recargas); los siguientes
+reciben 429. El límite va por identificador de pantalla y no por IP porque
+las flotas suelen llegar todas desde la misma dirección (NAT o nginx
+delante). Los contadores son de cada worker.
+
+/panel/pantallas (con sesión) resume el estado de cada pantalla en la
+última hora a partir del SQLite.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from flask import current_app, jsonify, request
+from flask_login import login_required
+
+from flask_app.jobs import job_queue
+
+MAX_BODY_BYTES = 16 * 1024
+MAX_METRICS = 50
+MAX_ERRORS = 20
+MAX_NAME_LENGTH = 64
+MAX_ERROR_LENGTH = 300
+# Sin lotes en este tiempo la pantalla se considera caída
+SCREEN_TIMEOUT_SECONDS = 300
+
+
+def _number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+class TelemetryStore:
+    def __init__(self):
+        self.path = None
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn = None
+        self._metrics = {}  # (pantalla, métrica) -> [n, suma, max]
+        self._screens = {}  # pantalla -> (visto, uptime, memoria, user_agent)
+        self._errors = []   # (pantalla, momento, mensaje)
+        self._batches_by_screen = {}  # pantalla -> lotes en el periodo
+        self._dropped = {}  # qué se descartó en el periodo -> cuántos
+        self._period_start = time.time()
+        self.max_screens = 500
+        self.max_keys = 5000
+        self.max_errors = 1000
+        self.batches_per_screen = 10
+
+    def configure(self, path, max_screens=500, max_keys=5000, max_errors=1000, batches_per_screen=10):
+        self.path = path
+        self.max_screens = max_screens
+        self.max_keys = max_keys
+        self.max_errors = max_errors
+        self.batches_per_screen = batches_per_screen
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS telemetry ('
+            ' screen TEXT NOT NULL,'
+            ' period REAL NOT NULL,'
+            ' metric TEXT NOT NULL,'
+            ' count INTEGER NOT NULL,'
+            ' total REAL NOT NULL,'
+            ' max REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_telemetry_period ON telemetry (period)')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS telemetry_errors ('
+            ' screen TEXT NOT NULL,'
+            ' at REAL NOT NULL,'
+            ' message TEXT NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_telemetry_errors_at ON telemetry_errors (at)')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS telemetry_screens ('
+            ' screen TEXT PRIMARY KEY,'
+            ' last_seen REAL NOT NULL,'
+            ' uptime REAL,'
+            ' memory REAL,'
+            ' user_agent TEXT)'
+        )
+
+    def _drop(self, what, count=1):
+        self._dropped[what] = self._dropped.get(what, 0) + count
+
+    def allow(self, screen):
+        """Cuenta un lote de `screen`; False si ya agotó los de este periodo."""
+        with self._lock:
+            sent = self._batches_by_screen.get(screen, 0)
+            if sent >= self.batches_per_screen:
+                self._drop('lotes')
+                return False
+            # Las pantallas que no caben en max_screens no se cuentan: record()
+            # descarta su lote
+            if sent or len(self._batches_by_screen) < self.max_screens:
+                self._batches_by_screen[screen] = sent + 1
+            return True
+
+    def record(self, screen, batch, user_agent=None):
+        """Suma un lote ya validado a los acumulados en memoria.
+
+        Devuelve False si el lote se descartó porque ya hay max_screens
+        pantallas en el periodo.
+        """
+        now = time.time()
+        with self._lock:
+            if screen not in self._screens and len(self._screens) >= self.max_screens:
+                self._drop('pantallas')
+                return False
+            for name, (count, total, maximum) in batch['metricas'].items():
+                entry = self._metrics.get((screen, name))
+                if entry is None:
+                    if len(self._metrics) >= self.max_keys:
+                        self._drop('metricas')
+                        continue
+                    self._metrics[(screen, name)] = [count, total, maximum]
+                else:
+                    entry[0] += count
+                    entry[1] += total
+                    entry[2] = max(entry[2], maximum)
+            self._screens[screen] = (now, batch['uptime'], batch['memoria'], user_agent)
+            room = max(0, self.max_errors - len(self._errors))
+            self._errors.extend((screen, now, message) for message in batch['errores'][:room])
+            if len(batch['errores']) > room:
+                self._drop('errores', len(batch['errores']) - room)
+        return True
+
+    def flush(self, retention_days):
+        """Vuelca lo acumulado al SQLite en una transacción y aplica la retención.
+
+        Devuelve lo descartado en el periodo por los límites, p. ej.
+        {'pantallas': 12, 'lotes': 40} (vacío si no se descartó nada).
+        """
+        with self._lock:
+            metrics, self._metrics = self._metrics, {}
+            screens, self._screens = self._screens, {}
+            errors, self._errors = self._errors, []
+            dropped, self._dropped = self._dropped, {}
+            self._batches_by_screen = {}
+            period, self._period_start = self._period_start, time.time()
+        if self._conn is None:
+            return dropped
+
+        cutoff = time.time() - retention_days * 86400
+        with self._db_lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.executemany(
+                    'INSERT INTO telemetry (screen, period, metric, count, total, max) VALUES (?, ?, ?, ?, ?, ?)',
+                    [(screen, period, name, int(count), total, maximum)
+                     for (screen, name), (count, total, maximum) in metrics.items()]
+                )
+                self._conn.executemany(
+                    'INSERT INTO telemetry_screens (screen, last_seen, uptime, memory, user_agent)'
+                    ' VALUES (?, ?, ?, ?, ?)'
+                    ' ON CONFLICT (screen) DO UPDATE SET last_seen = excluded.last_seen,'
+                    ' uptime = excluded.uptime, memory = excluded.memory, user_agent = excluded.user_agent'
+                    ' WHERE excluded.last_seen > telemetry_screens.last_seen',
+                    [(screen,) + values for screen, values in screens.items()]
+                )
+                self._conn.executemany('INSERT INTO telemetry_errors (screen, at, message) VALUES (?, ?, ?)', errors)
+                self._conn.execute('DELETE FROM telemetry WHERE period < ?', (cutoff,))
+                self._conn.execute('DELETE FROM telemetry_errors WHERE at < ?', (cutoff,))
+                self._conn.execute('DELETE FROM telemetry_screens WHERE last_seen < ?', (cutoff,))
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return dropped
+
+    def screens(self, since_seconds=3600):
+        """Resumen por pantalla de la última `since_seconds`, a partir del SQLite."""
+        if self._conn is None:
+            return []
+        now = time.time()
+        since = now - since_seconds
+        with self._db_lock:
+            screens = self._conn.execute(
+                'SELECT screen, last_seen, uptime, memory, user_agent FROM telemetry_screens ORDER BY screen'
+            ).fetchall()
+            metrics = self._conn.execute(
+                'SELECT screen, metric, SUM(count), SUM(total), MAX(max) FROM telemetry'
+                ' WHERE period >= ? GROUP BY screen, metric', (since,)
+            ).fetchall()
+            errors = self._conn.execute(
+                'SELECT screen, at, message FROM telemetry_errors WHERE at >= ? ORDER BY at DESC', (since,)
+            ).fetchall()
+
+        summary = {}
+        for screen, last_seen, uptime, memory, user_agent in screens:
+            age = now - last_seen
+            summary[screen] = {
+                'pantalla': screen,
+                'estado': 'ok' if age <= SCREEN_TIMEOUT_SECONDS else 'sin_datos',
+                'visto_hace': round(age, 1),
+                'uptime': uptime,
+                'memoria': memory,
+                'user_agent': user_agent,
+                'metricas': {},
+                'errores': 0,
+                'ultimos_errores': [],
+            }
+        for screen, metric, count, total, maximum in metrics:
+            if screen in summary and count:
+                summary[screen]['metricas'][metric] = {
+                    'n': count, 'avg': round(total / count, 1), 'max': round(maximum, 1)
+                }
+        for screen, at, message in errors:
+            if screen in summary:
+                summary[screen]['errores'] += 1
+                if len(summary[screen]['ultimos_errores']) < 5:
+                    summary[screen]['ultimos_errores'].append({'hace': round(now - at, 1), 'mensaje': message})
+        return list(summary.values())
+
+
+telemetry_store = TelemetryStore()
+
+
+def parse_batch(data):
+    """Valida un lote de una pantalla; devuelve (pantalla, lote) o lanza ValueError."""
+    if not isinstance(data, dict):
+        raise ValueError('El lote debe ser un objeto JSON')
+    screen = data.get('pantalla')
+    if not isinstance(screen, str) or not screen or len(screen) > MAX_NAME_LENGTH:
+        raise ValueError('Falta el identificador de pantalla')
+
+    raw_metrics = data.get('metricas') or {}
+    if not isinstance(raw_metrics, dict) or len(raw_metrics) > MAX_METRICS:
+        raise ValueError('metricas debe ser un objeto con como mucho %d entradas' % MAX_METRICS)
+    metrics = {}
+    for name, values in raw_metrics.items():
+        if len(name) > MAX_NAME_LENGTH or not isinstance(values, list) or len(values) != 3:
+            raise ValueError(f'Métrica inválida: {name[:MAX_NAME_LENGTH]}')
+        count, total, maximum = (_number(v) for v in values)
+        if count is None or total is None or maximum is None or count < 0:
+            raise ValueError(f'Métrica inválida: {name}')
+        if count:
+            metrics[name] = (count, total, maximum)
+
+    raw_errors = data.get('errores') or []
+    if not isinstance(raw_errors, list):
+        raise ValueError('errores debe ser una lista')
+    errors = [str(e)[:MAX_ERROR_LENGTH] for e in raw_errors[:MAX_ERRORS]]
+
+    return screen, {
+        'uptime': _number(data.get('uptime')),
+        'memoria': _number(data.get('memoria')),
+        'metricas': metrics,
+        'errores': errors,
+    }
+
+
+def init_telemetry(app):
+    """Abre el almacén, programa el volcado y registra las rutas de telemetría."""
+    app.config.setdefault('TELEMETRY_DB_PATH', os.path.join(app.instance_path, 'telemetry.sqlite3'))
+    app.config.setdefault('TELEMETRY_FLUSH_SECONDS', 60)
+    app.config.setdefault('TELEMETRY_RETENTION_DAYS', 7)
+    app.config.setdefault('TELEMETRY_MAX_SCREENS', 500)
+    app.config.setdefault('TELEMETRY_MAX_KEYS', 5000)
+    app.config.setdefault('TELEMETRY_MAX_ERRORS', 1000)
+    app.config.setdefault('TELEMETRY_BATCHES_PER_SCREEN', 10)
+
+    telemetry_store.configure(
+        app.config['TELEMETRY_DB_PATH'],
+        max_screens=app.config['TELEMETRY_MAX_SCREENS'],
+        max_keys=app.config['TELEMETRY_MAX_KEYS'],
+        max_errors=app.config['TELEMETRY_MAX_ERRORS'],
+        batches_per_screen=app.config['TELEMETRY_BATCHES_PER_SCREEN'],
+    )
+    job_queue.schedule('flush_telemetry', app.config['TELEMETRY_FLUSH_SECONDS'])
+
+    @app.route('/panel/telemetry', methods=['POST'])
+    def post_telemetry():
+        """API pública: lote de métricas de una pantalla"""
+        if request.content_length is not None and request.content_length > MAX_BODY_BYTES:
+            return jsonify({'error': 'Lote demasiado grande'}), 413
+        try:
+            # sendBeacon puede enviar el JSON sin Content-Type de JSON
+            screen, batch = parse_batch(request.get_json(force=True, silent=True))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if not telemetry_store.allow(screen):
+            return jsonify({'error': 'Demasiados lotes; vuelva a intentarlo en el próximo minuto'}), 429
+        try:
+            telemetry_store.record(screen, batch, request.user_agent.string[:200] or None)
+        except Exception as e:
+            current_app.logger.exception('Error en post_telemetry')
+            return jsonify({'error': str(e)}), 500
+        return '', 204
+
+    @app.route('/panel/pantallas')
+    @login_required
+    def get_pantallas():
+        """Estado de cada pantalla en la última hora (JSON)"""
+        try:
+            return jsonify(telemetry_store.screens())
+        except Exception as e:
+            current_app.logger.exception('Error en get_pantallas')
+            return jsonify({'error': str(e)}), 500
@@ -0,0 +1,137 @@
+"""
+Tiempos por fase de cada petición.
+
+Cada petición lleva un RequestTimer en `g` al que se suman las fases medidas
+con `with phase(nombre):`
+- db: conexión y consultas a MySQL (config/mysqlconnection.py)
+- weather: consulta a Open-Meteo, incluida la espera a otro worker
+- map: mapeo de avisos (build_image_url, humanize_main_date...) y
+  serialización del JSON
+- render: plantillas Jinja (señales de Flask, sin tocar las vistas)
+- compress: compresión gzip/brotli de la respuesta
+
+Al terminar se añade la cabecera `Server-Timing` (visible en las devtools
+del navegador) y se escribe una línea JSON en el logger `flask_app.access`:
+
+    {"method":"GET","path":"/","status":200,"bytes":5123,"ms":18.2,
+     "db_ms":6.1,"db_n":2,"weather_ms":0.0,"weather_n":1,"render_ms":7.4,...}
+
+Fuera de una petición (tareas en segundo plano, scripts) phase() no mide
+nada. SERVER_TIMING_ENABLED y ACCESS_LOG_ENABLED desactivan cada salida; las
+peticiones a /static no se registran en el log.
+"""
+from contextlib import contextmanager
+import json
+import logging
+import time
+
+from flask import before_render_template, g, has_app_context, request, template_rendered
+
+access_logger = logging.getLogger('flask_app.access')
+
+
+class RequestTimer:
+    __slots__ = ('started', 'phases', '_render_started')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}  # nombre -> [ms, veces]
+        self._render_started = None
+
+    def add(self, name, ms):
+        entry = self.phases.get(name)
+        if entry is None:
+            self.phases[name] = [ms, 1]
+        else:
+            entry[0] += ms
+            entry[1] += 1
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self, total_ms):
+        parts = [f'{name};dur={ms:.1f}' for name, (ms, _) in self.phases.items()]
+        parts.append(f'total;dur={total_ms:.1f}')
+        return ', '.join(parts)
+
+
+def _current_timer():
+    return g.get('_timing') if has_app_context() else None
+
+
+@contextmanager
+def phase(name):
+    """Suma la duración del bloque a la fase `name` de la petición en curso."""
+    timer = _current_timer()
+    if timer is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, (time.perf_counter() - started) * 1000)
+
+
+def _access_record(timer, response, total_ms):
+    record = {
+        'method': request.method,
+        'path': request.path,
+        'endpoint': request.endpoint,
+        'status': response.status_code,
+        'bytes': response.content_length,
+        'ms': round(total_ms, 1),
+        'ip': request.remote_addr,
+    }
+    for name, (ms, count) in timer.phases.items():
+        record[f'{name}_ms'] = round(ms, 1)
+        record[f'{name}_n'] = count
+    return record
+
+
+def init_timing(app):
+    """Registra los hooks de medición, la cabecera Server-Timing y el log de acceso."""
+    app.config.setdefault('SERVER_TIMING_ENABLED', True)
+    app.config.setdefault('ACCESS_LOG_ENABLED', True)
+
+    if not app.config['SERVER_TIMING_ENABLED'] and not app.config['ACCESS_LOG_ENABLED']:
+        return
+
+    if app.config['ACCESS_LOG_ENABLED'] and not access_logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        access_logger.addHandler(handler)
+        access_logger.setLevel(logging.INFO)
+        access_logger.propagate = False
+
+    @app.before_request
+    def _start_timer():
+        g._timing = RequestTimer()
+
+    # Registrado antes que la compresión: los after_request se ejecutan en
+    # orden inverso, así que este corre el último y el total la incluye.
+    @app.after_request
+    def _emit_timing(response):
+        timer = g.pop('_timing', None)
+        if timer is None:
+            return response
+        total_ms = timer.elapsed_ms()
+        if app.config['SERVER_TIMING_ENABLED']:
+            response.headers['Server-Timing'] = timer.server_timing(total_ms)
+        if app.config['ACCESS_LOG_ENABLED'] and request.endpoint != 'static':
+            access_logger.info(json.dumps(_access_record(timer, response, total_ms), separators=(',', ':')))
+        return response
+
+    def _render_started(sender, **extra):
+        timer = _current_timer()
+        if timer is not None:
+            timer._render_started = time.perf_counter()
+
+    def _render_finished(sender, **extra):
+        timer = _current_timer()
+        if timer is not None and timer._render_started is not None:
+            timer.add('render', (time.perf_counter() - timer._render_started) * 1000)
+            timer._render_started = None
+
+    before_render_template.connect(_render_started, app, weak=False)
+    template_rendered.connect(_render_finished, app, weak=False)
@@ -0,0 +1,104 @@
+"""
+Comprobación del reparto de lecturas entre réplicas, sin MySQL.
+
+Sustituye `mysqlconnection.connector` por un conector falso en memoria que
+anota a qué servidor se conecta cada llamada y falla para los servidores
+marcados como caídos. Comprueba que:
+
+- las escrituras (connectToMySQL(db)) van siempre al primario;
+- las lecturas (read_only=True) recorren las réplicas en round-robin;
+- una réplica que no responde se salta y la lectura va a la siguiente;
+- tras DB_BREAKER_THRESHOLD fallos el circuito de la réplica se abre y deja
+  de intentarse;
+- si no queda ninguna réplica sana la lectura va al primario.
+
+Uso:
+    python tools/comprobar_replicas.py
+"""
+import itertools
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask_app.config import mysqlconnection as m  # noqa: E402
+
+PRIMARIO = ('primario', 3306)
+REPLICA_A = ('replica-a', 3306)
+REPLICA_B = ('replica-b', 3306)
+
+
+class ConectorFalso:
+    """Conector compatible con pymysql.connect que no abre ningún socket."""
+
+    def __init__(self):
+        self.conexiones = []
+        self.caidos = set()
+
+    def __call__(self, host, port, **kwargs):
+        servidor = (host, port)
+        self.conexiones.append(servidor)
+        if servidor in self.caidos:
+            raise OSError(f'Connection refused: {host}:{port}')
+        return ConexionFalsa()
+
+
+class ConexionFalsa:
+    def close(self):
+        pass
+
+
+def preparar():
+    conector = ConectorFalso()
+    m.connector = conector
+    m.PRIMARY = PRIMARIO
+    m.REPLICAS = [REPLICA_A, REPLICA_B]
+    m._breakers.clear()
+    m._round_robin = itertools.count()
+    return conector
+
+
+def servidores_de_lecturas(n):
+    servidores = []
+    for _ in range(n):
+        conexion = m.connectToMySQL('panel', read_only=True)
+        servidores.append(conexion.host)
+        conexion.close()
+    return servidores
+
+
+def comprobar(nombre, obtenido, esperado):
+    if obtenido != esperado:
+        raise SystemExit(f'FALLO {nombre}: se esperaba {esperado}, se obtuvo {obtenido}')
+    print(f'ok  {nombre}')
+
+
+def main():
+    conector = preparar()
+    escritura = m.connectToMySQL('panel')
+    comprobar('escrituras al primario', escritura.host, PRIMARIO)
+    escritura.close()
+
+    comprobar('round-robin entre réplicas', servidores_de_lecturas(4), [REPLICA_A, REPLICA_B, REPLICA_A, REPLICA_B])
+
+    conector = preparar()
+    conector.caidos.add(REPLICA_A)
+    comprobar('réplica caída se salta', servidores_de_lecturas(2), [REPLICA_B, REPLICA_B])
+
+    # Los fallos abren el circuito y la réplica deja de intentarse
+    for _ in range(m.BREAKER_THRESHOLD):
+        servidores_de_lecturas(1)
+    comprobar('circuito abierto', m.breaker_for(REPLICA_A).state, m.CircuitBreaker.OPEN)
+    conector.conexiones.clear()
+    servidores_de_lecturas(3)
+    comprobar('sin intentos a la réplica abierta', REPLICA_A in conector.conexiones, False)
+
+    conector = preparar()
+    conector.caidos.update({REPLICA_A, REPLICA_B})
+    comprobar('sin réplicas, lectura al primario', servidores_de_lecturas(1), [PRIMARIO])
+
+    print('Todas las comprobaciones pasaron')
+
+
+if __name__ == '__main__':
+    main()
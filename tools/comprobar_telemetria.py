@@ -0,0 +1,83 @@
+"""
+Comprobación de los límites de POST /panel/telemetry, sin MySQL.
+
+Monta una app mínima con init_telemetry() y un SQLite temporal y simula una
+flota detrás de una sola dirección (NAT o nginx delante). Comprueba que:
+
+- PANTALLAS pantallas desde la misma IP, con su lote periódico y el de
+  pagehide, se aceptan todas (204) y aparecen como 'ok' tras el volcado;
+- una pantalla que supera TELEMETRY_BATCHES_PER_SCREEN lotes en el periodo
+  recibe 429 sin afectar a las demás;
+- las pantallas por encima de TELEMETRY_MAX_SCREENS se descartan y se
+  cuentan;
+- el volcado reinicia los contadores.
+
+Uso:
+    python tools/comprobar_telemetria.py
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask import Flask  # noqa: E402
+from flask_login import LoginManager  # noqa: E402
+
+from flask_app.telemetry import init_telemetry, telemetry_store  # noqa: E402
+
+PANTALLAS = 300
+IP = '10.0.0.1'
+
+
+def crear_app(directorio):
+    app = Flask(__name__, instance_path=directorio)
+    app.secret_key = 'comprobacion'
+    app.config['TELEMETRY_DB_PATH'] = os.path.join(directorio, 'telemetry.sqlite3')
+    app.config['TELEMETRY_MAX_SCREENS'] = PANTALLAS + 10
+    LoginManager().init_app(app)
+    init_telemetry(app)
+    return app
+
+
+def enviar(cliente, pantalla):
+    lote = {'pantalla': pantalla, 'uptime': 60, 'metricas': {'cuadro_ms': [600, 6000, 40]}, 'errores': []}
+    return cliente.post('/panel/telemetry', json=lote, environ_base={'REMOTE_ADDR': IP}).status_code
+
+
+def comprobar(nombre, obtenido, esperado):
+    if obtenido != esperado:
+        raise SystemExit(f'FALLO {nombre}: se esperaba {esperado}, se obtuvo {obtenido}')
+    print(f'ok  {nombre}')
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directorio:
+        app = crear_app(directorio)
+        cliente = app.test_client()
+        limite = app.config['TELEMETRY_BATCHES_PER_SCREEN']
+
+        # Lote periódico y beacon de pagehide de cada pantalla, desde la misma IP
+        estados = {enviar(cliente, f'p{i}') for i in range(PANTALLAS) for _ in range(2)}
+        comprobar(f'{PANTALLAS} pantallas detrás de una IP', estados, {204})
+
+        estados = [enviar(cliente, 'ruidosa') for _ in range(limite + 3)]
+        comprobar('pantalla que supera su límite', estados, [204] * limite + [429] * 3)
+        comprobar('las demás siguen aceptadas', enviar(cliente, 'p0'), 204)
+
+        estados = {enviar(cliente, f'extra{i}') for i in range(20)}
+        comprobar('pantallas por encima del máximo aceptadas sin guardar', estados, {204})
+
+        descartado = telemetry_store.flush(app.config['TELEMETRY_RETENTION_DAYS'])
+        comprobar('descartes contados', descartado, {'lotes': 3, 'pantallas': 11})
+        resumen = telemetry_store.screens()
+        comprobar('pantallas guardadas', len(resumen), PANTALLAS + 10)
+        comprobar('todas con datos', {p['estado'] for p in resumen}, {'ok'})
+
+        comprobar('el volcado reinicia el límite', enviar(cliente, 'ruidosa'), 204)
+
+    print('Todas las comprobaciones pasaron')
+
+
+if __name__ == '__main__':
+    main()
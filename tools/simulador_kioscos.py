@@ -0,0 +1,414 @@
+"""
+Simulador de una flota de pantallas (kioscos) contra una app en ejecución.
+
+Reproduce, sin navegador, el calendario de peticiones de
+static/main_panel/script.js y de templates/admin_panel/panel.html:
+
+Pantalla (script.js):
+- Carga de página: GET /, luego GET /api/clima y GET /panel/avisos_hash
+  inmediatamente y GET /panel/avisos a los 2 s.
+- Cada 60 s: GET /panel/avisos_hash. Si el hash cambió, la página se
+  recarga al cabo de 1 s (se repite la carga completa).
+- Cada 10 min: GET /api/clima.
+- A los 2 s y luego cada 5 min: GET /panel/avisos_programados. Por cada
+  aviso programado, la imagen se descarga (GET image_url) en un momento al
+  azar de los próximos 2 min (sin pasar de 10 s antes de su hora) y se
+  vuelve a pedir para decodificarla 10 s antes de la hora (con
+  If-None-Match si la descarga devolvió ETag, como revalidaría el
+  navegador). Cada consulta reprograma las anteriores.
+- Cada 60 s: POST /panel/telemetry con un lote compacto (latencias de las
+  peticiones de la pantalla), y otro al recargar la página (sendBeacon).
+
+Administrador (panel.html):
+- Carga: GET /panel y dos GET /panel/avisos?all=1.
+- Cada 5 min: GET /panel/avisos_hash y, si cambió respecto al guardado,
+  GET /panel/avisos?all=1 (checkAndUpdateAvisos). El hash inicial lo
+  calcula el panel a partir de la lista y nunca coincide con el del
+  servidor, así que la primera consulta siempre recarga; después solo
+  recarga tras una edición.
+
+Durante la ejecución se inyectan ediciones de un aviso como las hace el
+panel (GET /panel/avisos?all=1 al abrir el modal, PUT /panel/edit/<id> y
+otro GET /panel/avisos?all=1 al guardar)
+y al final se informa de percentiles de latencia por endpoint, tamaño de la
+"manada" de recargas tras cada edición y, si hay credenciales de MySQL en el
+entorno (DB_HOST, DB_USER, ...) y se usa --db-stats, las consultas ejecutadas
+por el servidor.
+
+Ejemplo:
+    python tools/simulador_kioscos.py --url http://localhost:5000 \\
+        --pantallas 200 --duracion 900 --escala 10 \\
+        --usuario admin --clave secreta --editar-cada 120
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import heapq
+import itertools
+import json
+import os
+import random
+import threading
+import time
+
+import requests
+
+# Intervalos de script.js y panel.html, en segundos
+CARGA_AVISOS_RETARDO = 2
+POLL_HASH = 60
+POLL_CLIMA = 600
+RECARGA_RETARDO = 1
+POLL_ADMIN = 300
+POLL_PROGRAMADOS = 300
+DISPERSION_DESCARGA = 120
+ANTELACION_DECODIFICAR = 10
+POLL_TELEMETRIA = 60
+
+
+class Metricas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.peticiones = []  # (inicio, endpoint, status, latencia_ms)
+        self.ediciones = []   # instantes de cada edición inyectada
+
+    def registrar(self, inicio, endpoint, status, latencia_ms):
+        with self._lock:
+            self.peticiones.append((inicio, endpoint, status, latencia_ms))
+
+    def por_endpoint(self):
+        grupos = {}
+        for _, endpoint, status, latencia in self.peticiones:
+            g = grupos.setdefault(endpoint, {'latencias': [], 'errores': 0})
+            g['latencias'].append(latencia)
+            if status is None or status >= 500:
+                g['errores'] += 1
+        resumen = {}
+        for endpoint, g in sorted(grupos.items()):
+            lat = sorted(g['latencias'])
+            resumen[endpoint] = {
+                'peticiones': len(lat),
+                'errores': g['errores'],
+                'p50_ms': percentil(lat, 50),
+                'p90_ms': percentil(lat, 90),
+                'p99_ms': percentil(lat, 99),
+                'max_ms': round(lat[-1], 1) if lat else None,
+            }
+        return resumen
+
+    def manadas(self, ventana):
+        """Recargas completas de avisos provocadas por cada edición."""
+        resultado = []
+        for t in self.ediciones:
+            recargas = sorted(
+                inicio - t for inicio, endpoint, _, _ in self.peticiones
+                if endpoint == '/panel/avisos' and t <= inicio < t + ventana
+            )
+            por_segundo = {}
+            for d in recargas:
+                por_segundo[int(d)] = por_segundo.get(int(d), 0) + 1
+            resultado.append({
+                'edicion_en_s': round(t, 1),
+                'recargas': len(recargas),
+                'pico_por_segundo': max(por_segundo.values()) if por_segundo else 0,
+                'ultima_recarga_s': round(recargas[-1], 1) if recargas else None,
+            })
+        return resultado
+
+
+def percentil(valores, p):
+    if not valores:
+        return None
+    idx = min(len(valores) - 1, int(round(p / 100 * (len(valores) - 1))))
+    return round(valores[idx], 1)
+
+
+class Simulador:
+    def __init__(self, args):
+        self.args = args
+        self.url = args.url.rstrip('/')
+        self.metricas = Metricas()
+        self.cola = []
+        self._cola_lock = threading.Lock()
+        self._secuencia = itertools.count()
+        self.pool = ThreadPoolExecutor(max_workers=args.hilos)
+        self.inicio = time.monotonic()
+        self.random = random.Random(args.semilla)
+        self.pantallas = {}
+        self.admin = None
+
+    # --- planificación -----------------------------------------------------
+
+    def programar(self, retardo, accion, quien, generacion=0):
+        retardo = retardo / self.args.escala
+        with self._cola_lock:
+            heapq.heappush(self.cola, (time.monotonic() + retardo, next(self._secuencia), accion, quien, generacion))
+
+    def con_jitter(self, segundos):
+        return segundos * (1 + self.random.uniform(-self.args.jitter, self.args.jitter))
+
+    def ahora(self):
+        return (time.monotonic() - self.inicio) * self.args.escala
+
+    # --- HTTP ---------------------------------------------------------------
+
+    def pedir(self, sesion, metodo, ruta, endpoint=None, **kwargs):
+        inicio = self.ahora()
+        t0 = time.perf_counter()
+        try:
+            r = sesion.request(metodo, self.url + ruta, timeout=self.args.timeout, **kwargs)
+            status = r.status_code
+        except requests.RequestException:
+            r, status = None, None
+        self.metricas.registrar(inicio, endpoint or ruta.split('?')[0], status, (time.perf_counter() - t0) * 1000)
+        return r
+
+    def pedir_pantalla(self, pid, metrica, metodo, ruta, endpoint=None, **kwargs):
+        """Como pedir(), sumando la latencia a la telemetría de la pantalla."""
+        t0 = time.perf_counter()
+        r = self.pedir(self.pantallas[pid]['sesion'], metodo, ruta, endpoint, **kwargs)
+        ms = (time.perf_counter() - t0) * 1000
+        with self._cola_lock:
+            entrada = self.pantallas[pid]['metricas'].setdefault(metrica, [0, 0.0, 0.0])
+            entrada[0] += 1
+            entrada[1] += ms
+            entrada[2] = max(entrada[2], ms)
+        return r
+
+    # --- pantallas ----------------------------------------------------------
+
+    def cargar_pagina(self, pid, generacion):
+        p = self.pantallas[pid]
+        # Estado de la página: se pierde en cada recarga
+        p['cargada'] = self.ahora()
+        p['descargadas'] = {}
+        p['decodificadas'] = set()
+        p['tanda'] = 0
+        self.pedir_pantalla(pid, 'fetch_home_ms', 'GET', '/', endpoint='/ (home)')
+        self.programar(0, self.clima, pid, generacion)
+        self.programar(0, self.hash, pid, generacion)
+        self.programar(CARGA_AVISOS_RETARDO, self.avisos, pid, generacion)
+        self.programar(CARGA_AVISOS_RETARDO, self.programados, pid, generacion)
+        self.programar(POLL_TELEMETRIA, self.telemetria, pid, generacion)
+
+    def hash(self, pid, generacion):
+        p = self.pantallas[pid]
+        r = self.pedir_pantalla(pid, 'fetch_avisos_hash_ms', 'GET', '/panel/avisos_hash')
+        self.programar(self.con_jitter(POLL_HASH), self.hash, pid, generacion)
+        try:
+            nuevo = r.json().get('hash') if r is not None and r.ok else None
+        except ValueError:
+            nuevo = None
+        if not nuevo:
+            return
+        if p['hash'] is None:
+            p['hash'] = nuevo
+        elif p['hash'] != nuevo:
+            # location.reload(): la nueva página reinicia todos los temporizadores
+            # y la que se cierra envía lo que le quedaba de telemetría
+            self.enviar_telemetria(pid)
+            p['hash'] = None
+            p['generacion'] += 1
+            self.programar(RECARGA_RETARDO, self.cargar_pagina, pid, p['generacion'])
+
+    def clima(self, pid, generacion):
+        self.pedir_pantalla(pid, 'fetch_clima_ms', 'GET', '/api/clima')
+        self.programar(self.con_jitter(POLL_CLIMA), self.clima, pid, generacion)
+
+    def avisos(self, pid, generacion):
+        self.pedir_pantalla(pid, 'fetch_avisos_ms', 'GET', '/panel/avisos')
+
+    def programados(self, pid, generacion):
+        p = self.pantallas[pid]
+        r = self.pedir_pantalla(pid, 'fetch_avisos_programados_ms', 'GET', '/panel/avisos_programados')
+        self.programar(self.con_jitter(POLL_PROGRAMADOS), self.programados, pid, generacion)
+        try:
+            programados = r.json().get('avisos') if r is not None and r.ok else None
+        except ValueError:
+            programados = None
+        if not isinstance(programados, list):
+            return
+
+        # Cada consulta cancela las descargas que programó la anterior
+        p['tanda'] += 1
+        tanda = p['tanda']
+        ahora = datetime.now()
+        for aviso in programados:
+            url = aviso.get('image_url')
+            try:
+                inicio = datetime.fromisoformat(aviso['fecha_inicio'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if not url:
+                continue
+            # La hora de publicación es de reloj real: en segundos simulados
+            # está `escala` veces más lejos
+            hasta_decodificar = max(0, (inicio - ahora).total_seconds() * self.args.escala - ANTELACION_DECODIFICAR)
+            if hasta_decodificar > 0:
+                retardo = self.random.uniform(0, min(DISPERSION_DESCARGA, hasta_decodificar))
+                self.programar(retardo, self._imagen(url, tanda, decodificar=False), pid, generacion)
+            self.programar(hasta_decodificar, self._imagen(url, tanda, decodificar=True), pid, generacion)
+
+    def _imagen(self, url, tanda, decodificar):
+        def accion(pid, generacion):
+            p = self.pantallas[pid]
+            if p['tanda'] != tanda:
+                return
+            if decodificar:
+                if url in p['decodificadas']:
+                    return
+                p['decodificadas'].add(url)
+                etag = p['descargadas'].get(url)
+                cabeceras = {'If-None-Match': etag} if etag else {}
+                self.pedir_pantalla(pid, 'imagen_descarga_ms', 'GET', url,
+                                    endpoint='imagen programada (decodificar)', headers=cabeceras)
+            elif url not in p['descargadas']:
+                r = self.pedir_pantalla(pid, 'imagen_descarga_ms', 'GET', url, endpoint='imagen programada (reposo)')
+                if r is not None and r.ok:
+                    p['descargadas'][url] = r.headers.get('ETag')
+        return accion
+
+    def telemetria(self, pid, generacion):
+        self.enviar_telemetria(pid)
+        self.programar(self.con_jitter(POLL_TELEMETRIA), self.telemetria, pid, generacion)
+
+    def enviar_telemetria(self, pid):
+        p = self.pantallas[pid]
+        with self._cola_lock:
+            metricas, p['metricas'] = p['metricas'], {}
+        lote = {
+            'pantalla': f'sim-{pid}',
+            'uptime': round(self.ahora() - p['cargada'], 1),
+            'memoria': None,
+            'metricas': {
+                nombre: [n, round(suma, 1), round(maximo, 1)] for nombre, (n, suma, maximo) in metricas.items()
+            },
+            'errores': [],
+        }
+        self.pedir(p['sesion'], 'POST', '/panel/telemetry', json=lote)
+
+    # --- administrador ------------------------------------------------------
+
+    def iniciar_admin(self):
+        sesion = requests.Session()
+        r = sesion.post(self.url + '/login', data={'username': self.args.usuario, 'password': self.args.clave},
+                        allow_redirects=False, timeout=self.args.timeout)
+        if r.status_code != 302 or '/login' in r.headers.get('Location', ''):
+            raise SystemExit('No se pudo iniciar sesión como administrador')
+        # hash None: el que calcula el panel al cargar, distinto de cualquiera del servidor
+        self.admin = {'sesion': sesion, 'titulo': None, 'id': None, 'hash': None}
+        self.pedir(sesion, 'GET', '/panel')
+        for _ in range(2):
+            r = self.pedir(sesion, 'GET', '/panel/avisos?all=1', endpoint='/panel/avisos?all=1')
+        avisos = r.json() if r is not None and r.ok else []
+        if avisos:
+            self.admin['id'] = avisos[0]['id']
+            self.admin['titulo'] = avisos[0]['title'] or ''
+        self.programar(self.con_jitter(POLL_ADMIN), self.poll_admin, 'admin')
+        if self.args.editar_cada:
+            self.programar(self.args.editar_cada, self.editar, 'admin')
+
+    def poll_admin(self, _quien, _generacion):
+        sesion = self.admin['sesion']
+        self.programar(self.con_jitter(POLL_ADMIN), self.poll_admin, 'admin')
+        r = self.pedir(sesion, 'GET', '/panel/avisos_hash')
+        try:
+            nuevo = r.json().get('hash') if r is not None and r.ok else None
+        except ValueError:
+            nuevo = None
+        if nuevo and nuevo != self.admin['hash']:
+            self.pedir(sesion, 'GET', '/panel/avisos?all=1', endpoint='/panel/avisos?all=1')
+            self.admin['hash'] = nuevo
+
+    def editar(self, _quien, _generacion):
+        if self.admin['id'] is None:
+            return
+        n = len(self.metricas.ediciones)
+        titulo = self.admin['titulo'] + (' ' if n % 2 == 0 else '')
+        sesion = self.admin['sesion']
+        # El modal de edición busca el aviso en la lista y, tras guardar, el
+        # panel la vuelve a pintar sin actualizar su hash guardado
+        self.pedir(sesion, 'GET', '/panel/avisos?all=1', endpoint='/panel/avisos?all=1')
+        self.metricas.ediciones.append(self.ahora())
+        self.pedir(sesion, 'PUT', f"/panel/edit/{self.admin['id']}", endpoint='/panel/edit', json={'title': titulo})
+        self.pedir(sesion, 'GET', '/panel/avisos?all=1', endpoint='/panel/avisos?all=1')
+        self.programar(self.args.editar_cada, self.editar, 'admin')
+
+    # --- bucle principal ----------------------------------------------------
+
+    def ejecutar(self):
+        for pid in range(self.args.pantallas):
+            self.pantallas[pid] = {'sesion': requests.Session(), 'hash': None, 'generacion': 0, 'metricas': {}}
+            self.programar(self.random.uniform(0, self.args.arranque), self.cargar_pagina, pid)
+        if self.args.usuario:
+            self.iniciar_admin()
+
+        fin = self.inicio + self.args.duracion / self.args.escala
+        while time.monotonic() < fin:
+            with self._cola_lock:
+                siguiente = self.cola[0][0] if self.cola else fin
+            espera = siguiente - time.monotonic()
+            if espera > 0:
+                time.sleep(min(espera, 0.05))
+                continue
+            with self._cola_lock:
+                _, _, accion, quien, generacion = heapq.heappop(self.cola)
+            if quien != 'admin' and generacion != self.pantallas[quien]['generacion']:
+                continue  # temporizador de una página ya recargada
+            self.pool.submit(accion, quien, generacion)
+        self.pool.shutdown(wait=True)
+
+
+def contar_consultas():
+    """Contador global de sentencias del servidor MySQL (Questions)."""
+    import pymysql
+    from dotenv import load_dotenv
+    load_dotenv()
+    conn = pymysql.connect(host=os.getenv('DB_HOST'), user=os.getenv('DB_USER'), password=os.getenv('DB_PASSWORD'))
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SHOW GLOBAL STATUS WHERE Variable_name IN ('Questions', 'Com_select')")
+            return {nombre: int(valor) for nombre, valor in cursor.fetchall()}
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulador de flota de pantallas del panel informativo')
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--pantallas', type=int, default=50)
+    parser.add_argument('--duracion', type=float, default=900, help='segundos simulados')
+    parser.add_argument('--escala', type=float, default=1, help='factor de aceleración del tiempo')
+    parser.add_argument('--arranque', type=float, default=60, help='ventana de arranque escalonado (s)')
+    parser.add_argument('--jitter', type=float, default=0.02, help='deriva relativa de los temporizadores')
+    parser.add_argument('--hilos', type=int, default=64)
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--usuario', help='usuario administrador para polling de admin y ediciones')
+    parser.add_argument('--clave')
+    parser.add_argument('--editar-cada', type=float, default=0, help='segundos entre ediciones inyectadas')
+    parser.add_argument('--db-stats', action='store_true', help='leer contadores de MySQL antes y después')
+    parser.add_argument('--semilla', type=int, default=None)
+    parser.add_argument('--json', help='guardar el informe en este fichero')
+    args = parser.parse_args()
+
+    antes = contar_consultas() if args.db_stats else None
+    sim = Simulador(args)
+    sim.ejecutar()
+    despues = contar_consultas() if args.db_stats else None
+
+    informe = {
+        'pantallas': args.pantallas,
+        'duracion_s': args.duracion,
+        'endpoints': sim.metricas.por_endpoint(),
+        'manadas': sim.metricas.manadas(POLL_HASH + RECARGA_RETARDO + CARGA_AVISOS_RETARDO + 5),
+    }
+    if antes is not None:
+        informe['consultas_db'] = {k: despues[k] - antes[k] for k in antes}
+
+    print(json.dumps(informe, indent=2, ensure_ascii=False))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()